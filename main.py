@@ -11,9 +11,9 @@ from telegram_gpt.telegram import TelegramBot
 # Load environment variables from .env file
 load_dotenv()
 
-# API keys
+# API keys, GROQ_API_KEY may hold several comma-separated keys
 TELEGRAM_API_KEY = os.getenv('TELEGRAM_API_KEY')
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+GROQ_API_KEYS = [key.strip() for key in os.getenv('GROQ_API_KEY', '').split(',') if key.strip()]
 
 # Configuration file paths
 settings = "settings.yaml"
@@ -24,7 +24,7 @@ if __name__ == '__main__':
     logger = Logger(level=logging.INFO)
 
     # Validate critical environment variables
-    if not TELEGRAM_API_KEY or not GROQ_API_KEY:
+    if not TELEGRAM_API_KEY or not GROQ_API_KEYS:
         logger.error(
             module='Main',
             scope='Check .env',
@@ -33,10 +33,14 @@ if __name__ == '__main__':
         raise SystemExit("Environment variables missing. Aborting.")
 
     # Initialize plugs
-    gptplug = GPTPlug(logger=logger, token=GROQ_API_KEY)
     settingsplug = SettingsPlug(logger=logger, filepath=settings).load(settings)
+    gptplug = GPTPlug(logger=logger, tokens=GROQ_API_KEYS, settings=settingsplug.configuration)
     promptplug = PromptPlug(logger=logger, filepath=prompt).load(prompt)
 
+    # Drop cached completions whenever their inputs change
+    settingsplug.subscribe(gptplug.invalidate)
+    promptplug.subscribe(gptplug.invalidate)
+
     # Start the bot
     bot = TelegramBot(
         logger=logger,
@@ -0,0 +1,160 @@
+import asyncio
+from collections import deque
+import time
+from typing import Awaitable, Callable
+
+from telegram_gpt.logger import Logger
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Breaker
+
+
+class CircuitOpen(Exception):
+    """
+    Raised when the circuit breaker rejects a call without sending it upstream.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around the Groq API.
+
+    Trips open after a run of consecutive failures or when the error rate over a
+    sliding window gets too high. While open, calls fail fast. Once the cooldown
+    elapses, a limited number of half-open probes is let through: a healthy probe
+    closes the circuit, a failing one opens it for another cooldown.
+
+    When a probe callable is given, it is sent periodically while the circuit
+    is open, so recovery does not depend on user traffic.
+    """
+    module = 'Circuit Breaker'
+    states = {'closed': 0, 'half-open': 1, 'open': 2}
+
+    def __init__(self, logger: Logger, metrics: Metrics, policy: Breaker,
+                 probe: Callable[[], Awaitable[bool]] | None = None):
+        self.logger = logger
+        self.metrics = metrics
+        self.policy = policy
+        self.probe = probe
+        self.task: asyncio.Task | None = None
+
+        self.state = 'closed'
+        self.opened = 0.0
+        self.consecutive = 0
+        self.probing = 0
+        self.outcomes: deque[tuple[float, bool]] = deque()
+
+        self.metrics.set('circuit_state', self.states[self.state])
+
+    def _transition(self, state: str, reason: str) -> None:
+        """
+        Switch state, then log and export the change.
+        """
+        if state == self.state:
+            return
+
+        log = self.logger.warning if state == 'open' else self.logger.info
+        log(module=self.module, scope='Transition', message=f"Circuit {self.state} -> {state}: {reason}")
+
+        self.state = state
+        self.probing = 0
+        self.metrics.set('circuit_state', self.states[state])
+        self.metrics.increment('circuit_transitions_total', state=state)
+
+        if state == 'open':
+            self.opened = time.monotonic()
+
+            if self.probe is not None and (self.task is None or self.task.done()):
+                self.task = asyncio.ensure_future(self._probe())
+
+        if state == 'closed':
+            self.consecutive = 0
+            self.outcomes.clear()
+
+    async def _probe(self) -> None:
+        """
+        Periodically probe the upstream until the circuit closes.
+        """
+        while self.state != 'closed':
+            await asyncio.sleep(max(self.policy.cooldown - (time.monotonic() - self.opened), 0.0))
+
+            if not self.allow():
+                await asyncio.sleep(self.policy.cooldown)
+                continue
+
+            try:
+                healthy = await self.probe()
+            except Exception:
+                healthy = False
+
+            self.record(failed=not healthy)
+
+    def stop(self) -> None:
+        """
+        Cancel the background probe.
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+    def available(self) -> bool:
+        """
+        Check without side effects whether a call could currently be admitted.
+        """
+        return (not self.policy.enabled or self.state != 'open'
+                or time.monotonic() - self.opened >= self.policy.cooldown)
+
+    def allow(self) -> bool:
+        """
+        Admit a call, turning it into a half-open probe once the cooldown is over.
+
+        Returns:
+            bool: True if the call may be sent.
+        """
+        if not self.policy.enabled or self.state == 'closed':
+            return True
+
+        if self.state == 'open' and time.monotonic() - self.opened >= self.policy.cooldown:
+            self._transition('half-open', f"cooldown of {self.policy.cooldown}s elapsed")
+
+        if self.state == 'half-open' and self.probing < self.policy.probes:
+            self.probing += 1
+            return True
+
+        self.metrics.increment('circuit_rejections_total')
+        return False
+
+    def release(self) -> None:
+        """
+        Return an admitted call that ended without an outcome, e.g. was cancelled.
+        """
+        if self.state == 'half-open':
+            self.probing = max(self.probing - 1, 0)
+
+    def record(self, failed: bool) -> None:
+        """
+        Register the outcome of an admitted call.
+
+        Args:
+            failed (bool): Whether the call failed because of the upstream.
+        """
+        if self.state == 'half-open':
+            self._transition('open' if failed else 'closed', "probe failed" if failed else "probe succeeded")
+            return
+
+        now = time.monotonic()
+        self.outcomes.append((now, failed))
+
+        while self.outcomes and self.outcomes[0][0] < now - self.policy.window:
+            self.outcomes.popleft()
+
+        self.consecutive = self.consecutive + 1 if failed else 0
+
+        if self.state != 'closed' or not failed:
+            return
+
+        rate = sum(outcome for _, outcome in self.outcomes) / len(self.outcomes)
+
+        if self.consecutive >= self.policy.failures:
+            self._transition('open', f"{self.consecutive} consecutive failures")
+
+        elif len(self.outcomes) >= self.policy.min_requests and rate >= self.policy.error_rate:
+            self._transition('open', f"error rate {rate:.0%} over {self.policy.window}s")
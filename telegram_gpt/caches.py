@@ -0,0 +1,412 @@
+import asyncio
+from collections import OrderedDict, defaultdict
+import hashlib
+import re
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+import unicodedata
+
+from telegram_gpt.logger import Logger
+
+
+T = TypeVar('T')
+
+
+class TTLCache:
+    """
+    LRU cache with per-entry expiry, bounded by entry count and by approximate size in bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _drop(self, key: str) -> None:
+        """
+        Remove an entry and release its size.
+        """
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def get(self, key: str) -> Any | None:
+        """
+        Return a fresh value and mark it as recently used.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Any | None: Cached value, or None if missing or expired.
+        """
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within bounds.
+
+        Args:
+            key (str): Cache key.
+            value (Any): Value to store.
+            size (int): Approximate size of the value in bytes.
+        """
+        if size > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self._drop(key)
+
+        self.entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        self.entries.clear()
+        self.size = 0
+
+
+def normalize(text: str) -> list[str]:
+    """
+    Reduce a query to an order-insensitive list of lowercase words.
+
+    Casing, punctuation, emoji and word order are ignored.
+
+    Args:
+        text (str): Raw query.
+
+    Returns:
+        list[str]: Sorted words.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return sorted(re.findall(r'\w+', text))
+
+
+def simhash(words: list[str], bits: int = 64) -> int:
+    """
+    Compute the SimHash fingerprint of a word list.
+
+    Features are the words themselves and their character trigrams,
+    so small spelling differences only flip a few bits.
+
+    Args:
+        words (list[str]): Normalized words.
+        bits (int): Fingerprint width.
+
+    Returns:
+        int: Fingerprint.
+    """
+    weights = [0] * bits
+    features = [*words, *(word[i:i + 3] for word in words for i in range(max(len(word) - 2, 1)))]
+
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=bits // 8).digest(), 'big')
+
+        for bit in range(bits):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+class SimilarityCache:
+    """
+    Bounded near-duplicate cache indexed with SimHash and locality-sensitive banding.
+
+    Fingerprints are split into bands so that any two fingerprints within the
+    allowed Hamming distance share at least one band and are found without a full scan.
+    Entries are partitioned by a context key (model, parameters, prompt) and by the
+    words holding digits, so queries differing only in a number or a year never match.
+    """
+    bits = 64
+
+    def __init__(self, threshold: float, max_entries: int, ttl: float):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.distance = int((1 - threshold) * self.bits)
+        self.bands = min(self.distance + 1, self.bits)
+        self.width = self.bits // self.bands
+
+        self.entries: OrderedDict[int, tuple[float, str, int, Any]] = OrderedDict()
+        self.index: dict[tuple[str, int, int], set[int]] = defaultdict(set)
+        self.counter = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _bands(self, fingerprint: int) -> list[tuple[int, int]]:
+        """
+        Split a fingerprint into (band number, band value) pairs.
+        """
+        mask = (1 << self.width) - 1
+        return [(band, fingerprint >> band * self.width & mask) for band in range(self.bands)]
+
+    @staticmethod
+    def _partition(context: str, words: list[str]) -> str:
+        """
+        Extend the context key with the words holding digits, which must match exactly.
+        """
+        return "\0".join([context, *(word for word in words if any(char.isdigit() for char in word))])
+
+    def _drop(self, entry_id: int) -> None:
+        """
+        Remove an entry from storage and from the band index.
+        """
+        _, context, fingerprint, _ = self.entries.pop(entry_id)
+
+        for band, value in self._bands(fingerprint):
+            bucket = self.index[(context, band, value)]
+            bucket.discard(entry_id)
+
+            if not bucket:
+                del self.index[(context, band, value)]
+
+    def get(self, context: str, text: str) -> tuple[Any, float] | None:
+        """
+        Find the most similar fresh entry above the threshold.
+
+        Args:
+            context (str): Partition key.
+            text (str): Raw query.
+
+        Returns:
+            tuple[Any, float] | None: (cached value, similarity) or None.
+        """
+        words = normalize(text)
+
+        if not words:
+            return None
+
+        context = self._partition(context, words)
+        fingerprint = simhash(words, self.bits)
+        candidates = set().union(*(self.index.get((context, band, value), set())
+                                   for band, value in self._bands(fingerprint)))
+        best, similarity = None, self.threshold
+
+        for entry_id in candidates:
+            expires, _, other, _ = self.entries[entry_id]
+
+            if expires < time.monotonic():
+                self._drop(entry_id)
+                continue
+
+            score = 1 - (fingerprint ^ other).bit_count() / self.bits
+
+            if score >= similarity:
+                best, similarity = entry_id, score
+
+        if best is None:
+            return None
+
+        self.entries.move_to_end(best)
+        return self.entries[best][3], similarity
+
+    def put(self, context: str, text: str, value: Any) -> None:
+        """
+        Store a value under the fingerprint of text, evicting the least recently used entries.
+
+        Args:
+            context (str): Partition key.
+            text (str): Raw query.
+            value (Any): Value to store.
+        """
+        words = normalize(text)
+
+        if not words:
+            return
+
+        context = self._partition(context, words)
+        fingerprint = simhash(words, self.bits)
+        self.counter += 1
+        self.entries[self.counter] = (time.monotonic() + self.ttl, context, fingerprint, value)
+
+        for band, band_value in self._bands(fingerprint):
+            self.index[(context, band, band_value)].add(self.counter)
+
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        self.entries.clear()
+        self.index.clear()
+
+
+class Listener:
+    """
+    Delivers the text of a flight to one streaming waiter on its own task.
+
+    Text arriving while a delivery is in progress replaces the undelivered text,
+    so a slow waiter skips intermediate states instead of holding up the shared call.
+    """
+    module = 'Single Flight'
+
+    def __init__(self, logger: Logger, callback: Callable[[str], Awaitable[None]]):
+        self.logger = logger
+        self.callback = callback
+        self.task: asyncio.Task | None = None
+        self.text = ""
+        self.sent = ""
+
+    def offer(self, text: str) -> None:
+        """
+        Queue text for delivery, starting a delivery task if none is running.
+        """
+        self.text = text
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._deliver())
+
+    async def _deliver(self) -> None:
+        """
+        Hand the latest text to the callback until it has caught up.
+        """
+        while self.sent != self.text:
+            self.sent = text = self.text
+
+            try:
+                await self.callback(text)
+
+            except Exception as e:
+                self.logger.debug(
+                    module=self.module,
+                    scope='Deliver',
+                    message=f"Streaming callback failed with {e!r}"
+                )
+
+    async def drain(self) -> None:
+        """
+        Wait until the latest text has been delivered.
+        """
+        if self.task is not None:
+            await self.task
+
+    def close(self) -> None:
+        """
+        Abandon any delivery still in progress.
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+
+class Flight:
+    """
+    A shared in-flight call and the waiters attached to it.
+    """
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.listeners: list[Listener] = []
+        self.waiters = 0
+        self.text = ""
+
+    async def broadcast(self, text: str) -> None:
+        """
+        Forward accumulated text to every streaming waiter.
+
+        Each waiter is served by its own task, so this never waits on a waiter
+        and a failing or slow waiter does not affect the others or the shared call.
+        """
+        self.text = text
+
+        for listener in self.listeners:
+            listener.offer(text)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into a single execution.
+
+    The shared call runs in its own task, so a cancelled waiter only detaches from it.
+    The call itself is cancelled once no waiters are left. Streaming waiters receive
+    the latest accumulated text at their own pace, late joiners start from the text so far.
+    """
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+        self.flights: dict[str, Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def _land(self, key: str, flight: Flight) -> None:
+        """
+        Forget a finished flight so that later calls start afresh.
+        """
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    async def do(self, key: str, call: Callable[[Callable[[str], Awaitable[None]] | None], Awaitable[T]],
+                 on_delta: Callable[[str], Awaitable[None]] | None = None) -> tuple[T, bool]:
+        """
+        Run call, or join an identical call already in flight.
+
+        Args:
+            key (str): Identity of the call.
+            call (Callable): Starts the call given an optional delta callback.
+            on_delta (Callable, optional): Streaming callback of this waiter.
+
+        Returns:
+            tuple[T, bool]: (result, whether it was shared with an earlier caller)
+        """
+        flight = self.flights.get(key)
+        shared = flight is not None
+
+        if not shared:
+            flight = self.flights[key] = Flight()
+            flight.task = asyncio.ensure_future(call(flight.broadcast if on_delta is not None else None))
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+
+        flight.waiters += 1
+        listener = None
+
+        if on_delta is not None:
+            listener = Listener(logger=self.logger, callback=on_delta)
+            flight.listeners.append(listener)
+
+            if flight.text:
+                listener.offer(flight.text)
+
+        try:
+            result = await asyncio.shield(flight.task)
+
+            if listener is not None:
+                await listener.drain()
+
+            return result, shared
+
+        except asyncio.CancelledError:
+            if flight.waiters == 1:
+                flight.task.cancel()
+
+            raise
+
+        finally:
+            flight.waiters -= 1
+
+            if listener is not None:
+                flight.listeners.remove(listener)
+                listener.close()
@@ -13,4 +13,6 @@ Swear if it fits. Be witty. Be bold. Don’t repeat yourself. Always sound real.
 Never say you’re an AI.
 """
 
+MESSAGE_LIMIT = 4096
+
 DOCS = "https://github.com/mosphox/telegram-gpt"
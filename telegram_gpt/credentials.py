@@ -0,0 +1,224 @@
+import asyncio
+import importlib.util
+import time
+
+from groq import AsyncGroq
+import httpx
+
+from telegram_gpt.limiters import RateLimiter
+from telegram_gpt.logger import Logger
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Upstream
+
+
+AUTH_STATUSES = frozenset({401, 403})
+
+
+class NoCredentials(Exception):
+    """
+    Raised when every API key in the pool has been ejected.
+    """
+
+
+class Credential:
+    """
+    A Groq API key with its own connection pool and client.
+    """
+
+    def __init__(self, token: str, label: str, http: httpx.AsyncClient):
+        self.token = token
+        self.label = label
+        self.http = http
+        self.client = AsyncGroq(api_key=token, http_client=http, max_retries=0)
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+        self.ejected = False
+        self.limited = 0.0
+        self.used = 0.0
+        self.touched = 0.0
+
+
+class KeyPool:
+    """
+    Pool of API keys spreading requests by remaining rate limit budget.
+
+    The key with the most budget left for the target model wins, ties go to the
+    key that was rate limited least recently and then to the least recently used one.
+    Keys rejected with an authentication error are ejected from the pool.
+
+    Connection pools are opened ahead of the first request and kept alive with
+    lightweight requests while idle, so no request pays for DNS, TCP and TLS.
+    """
+    module = 'Key Pool'
+
+    def __init__(self, logger: Logger, metrics: Metrics, limiter: RateLimiter,
+                 tokens: list[str], upstream: Upstream):
+        self.logger = logger
+        self.metrics = metrics
+        self.limiter = limiter
+        self.upstream = upstream
+        self.task: asyncio.Task | None = None
+
+        # Keys are labelled by position only, labels end up in logs and /metrics
+        self.credentials = [
+            Credential(token=token, label=str(index), http=self._connect(upstream))
+            for index, token in enumerate(tokens)
+        ]
+
+        self.metrics.set('keys_active', len(self.credentials))
+
+    def _connect(self, upstream: Upstream) -> httpx.AsyncClient:
+        """
+        Build a keep-alive connection pool for one key.
+
+        HTTP/2 is only negotiated when requested and the 'h2' package is installed.
+
+        Returns:
+            httpx.AsyncClient: Pooled HTTP client.
+        """
+        http2 = upstream.http2 and importlib.util.find_spec('h2') is not None
+
+        if upstream.http2 and not http2:
+            self.logger.info(
+                module=self.module,
+                scope='Pool',
+                message="HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1"
+            )
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=upstream.pool_size,
+                max_keepalive_connections=upstream.keepalive,
+                keepalive_expiry=upstream.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(upstream.read_timeout, connect=upstream.connect_timeout)
+        )
+
+    def active(self) -> list[Credential]:
+        """
+        Keys that have not been ejected.
+        """
+        return [credential for credential in self.credentials if not credential.ejected]
+
+    def pick(self, model: str | None = None) -> Credential:
+        """
+        Choose the key for the next request.
+
+        Args:
+            model (str | None): Target model, None for model-independent calls.
+
+        Returns:
+            Credential: Selected key.
+
+        Raises:
+            NoCredentials: If every key has been ejected.
+        """
+        active = self.active()
+
+        if not active:
+            raise NoCredentials("Every Groq API key has been ejected")
+
+        credential = max(active, key=lambda item: (
+            self.limiter.budget(key=item.label, model=model) if model else 1.0,
+            -item.limited,
+            -item.used
+        ))
+
+        credential.used = time.monotonic()
+        self.metrics.increment('key_requests_total', key=credential.label)
+        return credential
+
+    def report(self, credential: Credential, status: int | None) -> bool:
+        """
+        Account a failed request made with a key.
+
+        Args:
+            credential (Credential): Key the request used.
+            status (int | None): HTTP status of the failure.
+
+        Returns:
+            bool: True if the key was ejected and the request may be repeated with another key.
+        """
+        if status == 429:
+            credential.limited = time.monotonic()
+            self.metrics.increment('key_limited_total', key=credential.label)
+
+        if status not in AUTH_STATUSES or credential.ejected:
+            return False
+
+        credential.ejected = True
+        self.metrics.increment('key_ejections_total', key=credential.label)
+        self.metrics.set('keys_active', len(self.active()))
+        self.logger.error(
+            module=self.module,
+            scope='Eject',
+            message=f"API key '{credential.label}' rejected with status {status}, removed from the pool"
+        )
+
+        return True
+
+    async def _touch(self, credential: Credential, url: str) -> None:
+        """
+        Send a request that spends no tokens to open or refresh a pooled connection.
+        """
+        try:
+            await credential.http.get(url, headers=credential.headers)
+            credential.touched = time.monotonic()
+
+        except httpx.HTTPError as e:
+            self.logger.debug(
+                module=self.module,
+                scope='Touch',
+                message=f"Keep-alive request for key '{credential.label}' failed: {e!r}"
+            )
+
+    async def warm(self, url: str) -> None:
+        """
+        Open connections for every key concurrently, then keep them alive in the background.
+
+        Args:
+            url (str): Endpoint answered without spending tokens.
+        """
+        started = time.monotonic()
+
+        await asyncio.gather(*(
+            self._touch(credential, url)
+            for credential in self.active()
+            for _ in range(self.upstream.warm)
+        ))
+
+        elapsed = time.monotonic() - started
+        self.metrics.set('warmup_seconds', elapsed)
+        self.logger.info(
+            module=self.module,
+            scope='Warm',
+            message=f"Warmed {self.upstream.warm} connection(s) for {len(self.active())} key(s) in {elapsed:.2f}s"
+        )
+
+        if self.upstream.idle_ping and (self.task is None or self.task.done()):
+            self.task = asyncio.ensure_future(self._keepalive(url))
+
+    async def _keepalive(self, url: str) -> None:
+        """
+        Refresh the connections of keys that saw no traffic for idle_ping seconds.
+        """
+        while True:
+            await asyncio.sleep(self.upstream.idle_ping)
+            now = time.monotonic()
+
+            await asyncio.gather(*(
+                self._touch(credential, url)
+                for credential in self.active()
+                if now - max(credential.used, credential.touched) >= self.upstream.idle_ping
+            ))
+
+    async def close(self) -> None:
+        """
+        Stop keep-alive traffic and close every connection pool.
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+        for credential in self.credentials:
+            await credential.http.aclose()
@@ -0,0 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import time
+from typing import AsyncIterator
+
+
+DEADLINE: ContextVar[float | None] = ContextVar('deadline', default=None)
+
+
+def remaining() -> float | None:
+    """
+    Seconds left until the current deadline.
+
+    Returns:
+        float | None: Time left, or None when no deadline is set.
+    """
+    deadline = DEADLINE.get()
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+@asynccontextmanager
+async def deadline(timeout: float | None) -> AsyncIterator[None]:
+    """
+    Bound the enclosed block by timeout seconds and expose the deadline to nested calls.
+
+    Tasks started inside the block inherit the deadline through their context.
+
+    Args:
+        timeout (float | None): Budget in seconds, falsy for no deadline.
+
+    Raises:
+        TimeoutError: When the block outlives its deadline.
+    """
+    if not timeout:
+        yield
+        return
+
+    token = DEADLINE.set(time.monotonic() + timeout)
+
+    try:
+        async with asyncio.timeout(timeout):
+            yield
+
+    finally:
+        DEADLINE.reset(token)
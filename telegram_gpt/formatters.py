@@ -1,7 +1,7 @@
 import re
 
-from telegram_gpt.constants import DOCS
-from telegram_gpt.structures import Model, Settings, Prompt
+from telegram_gpt.constants import DOCS, MESSAGE_LIMIT
+from telegram_gpt.structures import Completion, ModelCatalog, ProbeStats, Route, Settings, Prompt
 
 
 def escape(value: str | None) -> str:
@@ -17,6 +17,31 @@ def escape(value: str | None) -> str:
     return re.sub(r'([_*[\]()~`>#+=|{}.!-])', r'\\\1', str(value)) if value is not None else "N/A"
 
 
+def truncate(value: str, limit: int = MESSAGE_LIMIT) -> str:
+    """
+    Escape a string and cut it so the escaped result fits into a single Telegram message.
+
+    Args:
+        value (str): The raw string to escape.
+        limit (int): Maximum length of the escaped result.
+
+    Returns:
+        str: Escaped string no longer than limit.
+    """
+    escaped, length = [], 0
+
+    for char in value:
+        char = escape(char)
+        length += len(char)
+
+        if length > limit:
+            break
+
+        escaped.append(char)
+
+    return "".join(escaped)
+
+
 class Formatters:
     """
     Collection of static formatters for bot responses in Telegram.
@@ -37,21 +62,26 @@ class Formatters:
             f"`{DOCS}`\n\n"
             "`/models get`\n"
             "`/models list`\n"
+            "`/models routing`\n"
+            "`/models probes`\n"
             "`/models default`\n\n"
             "`/models set model <str>`\n"
             "`/models set temperature <float[0:2]>`\n"
             "`/models set frequency <float[-2:2]>`\n"
             "`/models set presence <float[-2:2]>`\n"
             "`/models set top <float[0:1]>`\n"
+            "`/models set tokens <int[0:1048576], 0 for auto>`\n"
+            "`/models set fallbacks <str,str|none>`\n"
+            "`/models set routing <str,str|none>`\n"
         )
 
     @staticmethod
-    def models_list(models: list[Model]) -> str:
+    def models_list(models: ModelCatalog) -> str:
         """
         Format the list of models.
 
         Args:
-            models (list[Model]): List of model objects.
+            models (ModelCatalog): Catalog of model objects.
 
         Returns:
             str: Formatted model info list or error message.
@@ -81,8 +111,53 @@ class Formatters:
             f"`frequency penalty \\- {escape(settings.frequency_penalty)}`\n"
             f"`presence penalty \\- {escape(settings.presence_penalty)}`\n"
             f"`top p \\- {escape(settings.top_p)}`\n"
+            f"`max tokens \\- {escape(settings.max_tokens or 'auto')}`\n"
+            f"`stream \\- {escape(settings.stream)}`\n"
+            f"`fallbacks \\- {escape(', '.join(settings.fallbacks) or None)}`\n"
+            f"`routing \\- {escape(', '.join(settings.routing.models) or None)}`\n"
+            f"`triage \\- {escape(settings.triage.model if settings.triage.enabled else None)}`\n"
         )
 
+    @staticmethod
+    def models_routing(routes: list[Route]) -> str:
+        """
+        Format the latency table of routed models.
+
+        Args:
+            routes (list[Route]): Estimates per model, fastest first.
+
+        Returns:
+            str: MarkdownV2-formatted table or notice.
+        """
+        return "`Routing`\n\n" + "\n".join(
+            f"`{escape(route.model)}`\n"
+            f"    `ttft {escape(None if route.ttft is None else f'{route.ttft:.2f}s')} \\| "
+            f"speed {escape(None if route.rate is None else f'{route.rate:.0f} tok/s')} \\| "
+            f"reply {escape(None if route.score is None else f'{route.score:.2f}s')} \\| "
+            f"picks {escape(route.picks)}`\n"
+            for route in routes
+        ) if routes else "`Routing is disabled`"
+
+    @staticmethod
+    def models_probes(stats: list[ProbeStats]) -> str:
+        """
+        Format the latency probe table.
+
+        Args:
+            stats (list[ProbeStats]): Probe summary per model, fastest first.
+
+        Returns:
+            str: MarkdownV2-formatted table or notice.
+        """
+        return "`Probes`\n\n" + "\n".join(
+            f"`{escape(row.model)}`\n"
+            f"    `ttft {escape(None if row.ttft is None else f'{row.ttft:.2f}s')} \\| "
+            f"total {escape(None if row.total is None else f'{row.total:.2f}s')} \\| "
+            f"errors {escape(f'{row.error_rate:.0%}')} of {escape(row.samples)} \\| "
+            f"{escape(None if row.age is None else f'{row.age:.0f}s')} ago`\n"
+            for row in stats
+        ) if stats else "`No probes recorded yet`"
+
     @staticmethod
     def models_set(response: dict[str, tuple[bool, str | int | float]]) -> str:
         """
@@ -102,12 +177,12 @@ class Formatters:
     @staticmethod
     def models_default() -> str:
         """
-        Response for resetting to default settings.
+        Response for resetting sampling parameters to their defaults.
 
         Returns:
             str: MarkdownV2-formatted confirmation.
         """
-        return "`Default settings are set`"
+        return "`Default model and sampling settings are set`"
 
     @staticmethod
     def prompt_help() -> str:
@@ -190,14 +265,166 @@ class Formatters:
         return "`/chat your_prompt_here`"
 
     @staticmethod
-    def chat_reply(response: tuple[bool, str]) -> str:
+    def chat_placeholder() -> str:
+        """
+        Placeholder shown while a streamed reply is being generated.
+
+        Returns:
+            str: Placeholder text.
+        """
+        return "`\\.\\.\\.`"
+
+    @staticmethod
+    def chat_partial(text: str) -> str:
+        """
+        Format a partially streamed reply.
+
+        Args:
+            text (str): Text accumulated so far.
+
+        Returns:
+            str: Escaped text cut to fit a single message.
+        """
+        return truncate(text) or Formatters.chat_placeholder()
+
+    @staticmethod
+    def chat_unavailable() -> str:
+        """
+        Response while the Groq API circuit breaker is open.
+
+        Returns:
+            str: MarkdownV2-formatted notice.
+        """
+        return "`Groq API is unavailable right now, try again in a bit`"
+
+    @staticmethod
+    def chat_busy() -> str:
+        """
+        Response when a completion was shed because the bot is at capacity.
+
+        Returns:
+            str: MarkdownV2-formatted notice.
+        """
+        return "`Too many requests right now, try again in a moment`"
+
+    @staticmethod
+    def chat_timeout() -> str:
+        """
+        Response when a completion did not finish within its deadline.
+
+        Returns:
+            str: MarkdownV2-formatted notice.
+        """
+        return "`The model took too long to answer, try again`"
+
+    @staticmethod
+    def chat_stopped() -> str:
+        """
+        Response when a generation was cancelled with /stop or by a newer message.
+
+        Returns:
+            str: MarkdownV2-formatted notice.
+        """
+        return "`Generation stopped`"
+
+    @staticmethod
+    def stop(count: int) -> str:
+        """
+        Result of the /stop command.
+
+        Args:
+            count (int): Number of cancelled generations.
+
+        Returns:
+            str: MarkdownV2-formatted confirmation.
+        """
+        return f"`Stopped {count} generation{'s' if count != 1 else ''}`" if count else "`Nothing to stop`"
+
+    @staticmethod
+    def chat_reply(response: Completion) -> str:
         """
         Format the result of a chat reply.
 
+        Names the answering model when a fallback had to step in.
+
         Args:
-            response (tuple): (success, content)
+            response (Completion): Completion outcome.
 
         Returns:
             str: LLM response or error message.
         """
-        return escape(response[1]) if response[0] else "`Something went wrong...`"
+        if response.reason == 'circuit':
+            return Formatters.chat_unavailable()
+
+        if response.reason == 'deadline':
+            return Formatters.chat_timeout()
+
+        if response.reason == 'busy':
+            return Formatters.chat_busy()
+
+        if not response.success:
+            return "`Something went wrong...`"
+
+        footer = f"\n\n`answered by {escape(response.model)}`" if response.fallback else ""
+        return truncate(response.text, MESSAGE_LIMIT - len(footer)) + footer
+
+    @staticmethod
+    def similar_help() -> str:
+        """
+        Usage guide for the /similar command.
+
+        Returns:
+            str: Help text.
+        """
+        return (
+            "`/similar usage`\n"
+            "`Read the docs at`\n"
+            f"`{DOCS}`\n\n"
+            "`/similar get`\n"
+            "`/similar on`\n"
+            "`/similar off`\n"
+        )
+
+    @staticmethod
+    def similar_get(enabled: bool) -> str:
+        """
+        Show whether near-duplicate answers are enabled for the chat.
+
+        Args:
+            enabled (bool): Current state for the chat.
+
+        Returns:
+            str: MarkdownV2-formatted state.
+        """
+        return f"`Near-duplicate cache is {'enabled' if enabled else 'disabled'} for this chat`"
+
+    @staticmethod
+    def metrics(snapshot: dict[str, float], prefix: str | None = None) -> list[str]:
+        """
+        Format the metrics snapshot, split into messages that fit Telegram limits.
+
+        Args:
+            snapshot (dict[str, float]): Series name -> value.
+            prefix (str | None): Only show series whose name starts with it.
+
+        Returns:
+            list[str]: MarkdownV2-formatted metrics messages.
+        """
+        lines = [
+            f"`{escape(name)} \\- {escape(round(value, 3))}`"
+            for name, value in sorted(snapshot.items())
+            if prefix is None or name.startswith(prefix)
+        ]
+
+        if not lines:
+            return [f"`No metrics starting with '{escape(prefix)}'`" if prefix else "`No metrics recorded yet`"]
+
+        messages = ["`Metrics`\n"]
+
+        for line in lines:
+            if len(messages[-1]) + len(line) + 1 > MESSAGE_LIMIT:
+                messages.append("")
+
+            messages[-1] = f"{messages[-1]}\n{line}" if messages[-1] else line
+
+        return messages
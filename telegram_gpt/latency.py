@@ -0,0 +1,211 @@
+from collections import defaultdict, deque
+import random
+
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Hedge, Route, Routing
+
+
+class LatencyWindow:
+    """
+    Fixed-size window of recent latency samples.
+    """
+
+    def __init__(self, size: int):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, value: float) -> None:
+        """
+        Record a latency sample in seconds.
+        """
+        self.samples.append(value)
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Nearest-rank percentile of the window.
+
+        Args:
+            percent (float): Percentile in range [0, 100].
+
+        Returns:
+            float | None: Latency in seconds, or None if the window is empty.
+        """
+        if not self.samples:
+            return None
+
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Decides when a duplicate completion request should be sent.
+
+    A hedge fires once the primary request has waited longer than the configured
+    percentile of recently observed time-to-first-byte for its model, and only while
+    the share of hedged requests stays below max_rate.
+    """
+
+    def __init__(self, policy: Hedge, metrics: Metrics):
+        self.policy = policy
+        self.metrics = metrics
+
+        self.windows: dict[str, LatencyWindow] = defaultdict(lambda: LatencyWindow(policy.window))
+        self.decisions: deque[bool] = deque(maxlen=policy.window)
+
+    def record(self, model: str, latency: float) -> None:
+        """
+        Record the time-to-first-byte of a successful request.
+        """
+        self.windows[model].add(latency)
+        self.metrics.observe('completion_ttfb_seconds', latency, model=model)
+
+    def delay(self, model: str) -> float | None:
+        """
+        How long to wait on the primary request before hedging.
+
+        Args:
+            model (str): Model of the primary request.
+
+        Returns:
+            float | None: Delay in seconds, or None if hedging does not apply.
+        """
+        window = self.windows[model]
+
+        if not self.policy.enabled or len(window) < self.policy.min_samples:
+            return None
+
+        return window.percentile(self.policy.percentile)
+
+    def fallback(self, model: str) -> str:
+        """
+        Model used for the duplicate request.
+        """
+        return self.policy.model or model
+
+    def admit(self, hedged: bool) -> bool:
+        """
+        Register the outcome of a hedge decision and check the hedge rate.
+
+        Args:
+            hedged (bool): Whether the caller wants to send a duplicate.
+
+        Returns:
+            bool: True if the duplicate may be sent.
+        """
+        if hedged:
+            rate = (sum(self.decisions) + 1) / (len(self.decisions) + 1)
+            hedged = rate <= self.policy.max_rate
+
+        self.decisions.append(hedged)
+        self.metrics.set('hedge_rate', sum(self.decisions) / len(self.decisions))
+
+        if hedged:
+            self.metrics.increment('hedges_total')
+
+        return hedged
+
+
+class Router:
+    """
+    Routes requests across interchangeable models by recent latency.
+
+    Time-to-first-token and generation speed are tracked per model as exponentially
+    weighted moving averages. A request goes to the model expected to deliver a typical
+    reply soonest; models never tried go first, and a small share of requests
+    goes to a random model so that estimates of the others stay fresh.
+    """
+
+    def __init__(self, policy: Routing, metrics: Metrics):
+        self.policy = policy
+        self.metrics = metrics
+
+        self.ttft: dict[str, float] = {}
+        self.rate: dict[str, float] = {}
+        self.picks: dict[str, int] = defaultdict(int)
+
+    def _average(self, table: dict[str, float], model: str, value: float) -> None:
+        """
+        Fold a sample into a moving average.
+        """
+        previous = table.get(model)
+        table[model] = value if previous is None else self.policy.alpha * value + (1 - self.policy.alpha) * previous
+
+    def observe_ttft(self, model: str, latency: float) -> None:
+        """
+        Record the time-to-first-token of a successful request.
+        """
+        self._average(self.ttft, model, latency)
+        self.metrics.set('routing_ttft_seconds', self.ttft[model], model=model)
+
+    def observe_rate(self, model: str, tokens: int, seconds: float) -> None:
+        """
+        Record the generation speed of a finished completion.
+
+        Args:
+            model (str): Model that generated the completion.
+            tokens (int): Completion tokens.
+            seconds (float): Time spent generating them.
+        """
+        if tokens <= 0 or seconds <= 0:
+            return
+
+        self._average(self.rate, model, tokens / seconds)
+        self.metrics.set('routing_tokens_per_second', self.rate[model], model=model)
+
+    def score(self, model: str) -> float | None:
+        """
+        Expected seconds until a typical reply from model is complete.
+
+        Returns:
+            float | None: Estimate, or None while the model has no samples.
+        """
+        if model not in self.ttft:
+            return None
+
+        rate = self.rate.get(model)
+        return self.ttft[model] + (self.policy.reply_tokens / rate if rate else 0.0)
+
+    def choose(self, models: list[str]) -> str:
+        """
+        Pick the model for the next request.
+
+        Args:
+            models (list[str]): Acceptable models, non-empty.
+
+        Returns:
+            str: Selected model.
+        """
+        untried = [model for model in models if self.score(model) is None and not self.picks[model]]
+        measured = [model for model in models if self.score(model) is not None]
+
+        if untried:
+            model, reason = untried[0], 'untried'
+
+        elif len(models) > 1 and random.random() < self.policy.explore:
+            model, reason = random.choice(models), 'explore'
+
+        elif measured:
+            model, reason = min(measured, key=self.score), 'fastest'
+
+        else:
+            model, reason = models[0], 'default'
+
+        self.picks[model] += 1
+        self.metrics.increment('routing_decisions_total', model=model, reason=reason)
+        return model
+
+    def table(self, models: list[str]) -> list[Route]:
+        """
+        Current estimates for models, fastest first.
+        """
+        routes = [
+            Route(model=model, ttft=self.ttft.get(model), rate=self.rate.get(model),
+                  score=self.score(model), picks=self.picks[model])
+            for model in models
+        ]
+
+        return sorted(routes, key=lambda route: (route.score is None, route.score or 0.0))
@@ -0,0 +1,352 @@
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+import time
+from typing import AsyncIterator, Hashable, Mapping
+
+from telegram_gpt.logger import Logger
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.retries import parse_duration
+from telegram_gpt.structures import Concurrency, RateLimit
+
+
+class RateLimited(Exception):
+    """
+    Raised when a request is shed because the local rate limiter would make it wait too long.
+    """
+
+    def __init__(self, key: str, model: str, wait: float):
+        super().__init__(f"Rate limit budget for '{model}' on key '{key}' exhausted, wait {wait:.1f}s")
+        self.key = key
+        self.model = model
+        self.wait = wait
+
+
+class Overloaded(Exception):
+    """
+    Raised when a completion is shed because too many are already running or queued.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Completion shed: {reason}")
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket that may go into debt to queue reservations.
+
+    Capacity, level and refill rate are learned from Groq rate limit headers.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """
+        Add tokens accumulated since the last update.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, amount: float) -> float:
+        """
+        Seconds until amount tokens are available.
+        """
+        self._refill()
+
+        if self.tokens >= amount:
+            return 0.0
+
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def level(self) -> float:
+        """
+        Share of the capacity currently available.
+        """
+        self._refill()
+        return max(self.tokens, 0.0) / self.capacity if self.capacity else 0.0
+
+    def take(self, amount: float) -> None:
+        """
+        Reserve amount tokens, possibly going into debt.
+        """
+        self._refill()
+        self.tokens -= amount
+
+    def sync(self, limit: float, remaining: float, reset: float | None) -> None:
+        """
+        Align the bucket with limits reported by the server.
+
+        Args:
+            limit (float): Bucket capacity.
+            remaining (float): Tokens currently left.
+            reset (float | None): Seconds until the bucket is full again.
+        """
+        self.capacity = limit
+        self.tokens = remaining
+        self.updated = time.monotonic()
+
+        if reset:
+            self.rate = (limit - remaining) / reset if limit > remaining else self.rate
+
+
+class RateLimiter:
+    """
+    Client-side limiter admitting requests per API key and model while
+    request and token budgets remain.
+
+    Buckets are created from the first response headers seen for a key / model
+    pair, so requests are admitted freely until the limits are known.
+    """
+    module = 'Rate Limiter'
+    kinds = ('requests', 'tokens')
+
+    def __init__(self, logger: Logger, metrics: Metrics, policy: RateLimit):
+        self.logger = logger
+        self.metrics = metrics
+        self.policy = policy
+
+        self.buckets: dict[tuple[str, str], dict[str, TokenBucket]] = {}
+
+    def learn(self, key: str, model: str, headers: Mapping[str, str]) -> None:
+        """
+        Update buckets from x-ratelimit-* response headers.
+
+        Args:
+            key (str): API key label.
+            model (str): Model the request was sent to.
+            headers (Mapping[str, str]): Response headers.
+        """
+        buckets = self.buckets.setdefault((key, model), {})
+
+        for kind in self.kinds:
+            try:
+                limit = float(headers[f'x-ratelimit-limit-{kind}'])
+                remaining = float(headers[f'x-ratelimit-remaining-{kind}'])
+            except (KeyError, ValueError):
+                continue
+
+            reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+
+            if kind not in buckets:
+                buckets[kind] = TokenBucket(capacity=limit, rate=limit / 60)
+
+            buckets[kind].sync(limit=limit, remaining=remaining, reset=reset)
+            self.metrics.set('ratelimit_remaining', remaining, key=key, model=model, kind=kind)
+
+    def budget(self, key: str, model: str) -> float:
+        """
+        Share of the learned budget left for a key / model pair.
+
+        Returns:
+            float: Lowest level over request and token buckets, 1.0 while limits are unknown.
+        """
+        buckets = self.buckets.get((key, model))
+        return min((bucket.level() for bucket in buckets.values()), default=1.0) if buckets else 1.0
+
+    async def acquire(self, key: str, model: str, tokens: int) -> None:
+        """
+        Wait until the request fits into the learned budget.
+
+        Args:
+            key (str): API key label.
+            model (str): Target model.
+            tokens (int): Estimated tokens the request will consume.
+
+        Raises:
+            RateLimited: If the wait would exceed the configured maximum.
+        """
+        buckets = self.buckets.get((key, model))
+
+        if not self.policy.enabled or not buckets:
+            return
+
+        amounts = {'requests': 1, 'tokens': tokens}
+        wait = max(bucket.wait(amounts[kind]) for kind, bucket in buckets.items())
+
+        if wait > self.policy.max_wait:
+            self.metrics.increment('ratelimit_shed_total', key=key, model=model)
+            raise RateLimited(key=key, model=model, wait=wait)
+
+        for kind, bucket in buckets.items():
+            bucket.take(amounts[kind])
+
+        if wait > 0:
+            self.metrics.increment('ratelimit_waits_total', key=key, model=model)
+            self.metrics.observe('ratelimit_wait_seconds', wait, key=key, model=model)
+            self.logger.debug(
+                module=self.module,
+                scope='Acquire',
+                message=f"Delaying request to '{model}' by {wait:.2f}s"
+            )
+
+            await asyncio.sleep(wait)
+
+
+class Bulkhead:
+    """
+    Caps concurrent upstream completions behind a bounded, weighted fair wait queue.
+
+    Callers over the cap wait for a slot, which is handed over directly on release.
+    Waiters are served by virtual finish time: every queued request of a user pushes
+    that user's next request 1 / weight further back, so a user flooding the queue
+    only delays themselves, and users with a higher weight are served more often.
+
+    A caller is shed when the queue or its user's share of it is full, or when it
+    waited longer than allowed.
+    """
+    module = 'Bulkhead'
+
+    def __init__(self, logger: Logger, metrics: Metrics, policy: Concurrency):
+        self.logger = logger
+        self.metrics = metrics
+        self.policy = policy
+
+        self.active = 0
+        self.depth = 0
+        self.clock = 0.0
+        self.sequence = 0
+        self.waiters: list[tuple[float, int, asyncio.Future, Hashable]] = []
+        self.queued: dict[Hashable, int] = {}
+        self.finish: dict[Hashable, float] = {}
+
+    def _export(self) -> None:
+        """
+        Publish current occupancy.
+        """
+        self.metrics.set('concurrency_active', self.active)
+        self.metrics.set('concurrency_queue_depth', self.depth)
+        self.metrics.set('concurrency_queued_users', len(self.queued))
+
+    def _shed(self, reason: str) -> Overloaded:
+        """
+        Account a rejected caller.
+        """
+        self.metrics.increment('concurrency_shed_total', reason=reason)
+        self.logger.warning(
+            module=self.module,
+            scope='Shed',
+            message=f"Completion shed ({reason}), {self.active} running, {self.depth} queued"
+        )
+
+        return Overloaded(reason)
+
+    def _dequeue(self, user: Hashable) -> None:
+        """
+        Account a request leaving the queue and forget users that are fully served.
+        """
+        self.depth -= 1
+        self.queued[user] -= 1
+
+        if not self.queued[user]:
+            del self.queued[user]
+
+            if self.finish.get(user, 0.0) <= self.clock:
+                self.finish.pop(user, None)
+
+    async def _acquire(self, user: Hashable, weight: float) -> None:
+        """
+        Take a slot, queueing for one when the cap is reached.
+
+        Args:
+            user (Hashable): Identity requests are balanced across.
+            weight (float): Share of the capacity relative to other users.
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeds the maximum.
+        """
+        if self.active < self.policy.limit and not self.depth:
+            self.active += 1
+            return
+
+        if self.depth >= self.policy.queue:
+            raise self._shed('queue_full')
+
+        if self.queued.get(user, 0) >= self.policy.per_user:
+            raise self._shed('user_queue_full')
+
+        tag = max(self.clock, self.finish.get(user, 0.0)) + 1 / max(weight, 1e-3)
+        future = asyncio.get_running_loop().create_future()
+
+        self.sequence += 1
+        self.finish[user] = tag
+        self.queued[user] = self.queued.get(user, 0) + 1
+        self.depth += 1
+        heapq.heappush(self.waiters, (tag, self.sequence, future, user))
+
+        self._export()
+        started = time.monotonic()
+
+        try:
+            async with asyncio.timeout(self.policy.max_wait):
+                await future
+
+        except (TimeoutError, asyncio.CancelledError) as e:
+            # A slot handed over right before the timeout or cancellation must be given back,
+            # otherwise the entry is left in the heap and skipped once it surfaces
+            if future.done() and not future.cancelled():
+                self._release()
+
+            else:
+                future.cancel()
+                self._dequeue(user)
+
+            if isinstance(e, TimeoutError):
+                raise self._shed('wait') from None
+
+            raise
+
+        finally:
+            self.metrics.observe('concurrency_wait_seconds', time.monotonic() - started)
+            self._export()
+
+    def _release(self) -> None:
+        """
+        Hand the slot to the waiter with the earliest virtual finish time, or free it.
+        """
+        while self.waiters:
+            tag, _, future, user = heapq.heappop(self.waiters)
+
+            if future.done():
+                continue
+
+            self.clock = tag
+            self._dequeue(user)
+            future.set_result(None)
+            return
+
+        self.active -= 1
+
+        if not self.depth:
+            self.finish.clear()
+
+    @asynccontextmanager
+    async def slot(self, user: Hashable = None, weight: float = 1.0) -> AsyncIterator[None]:
+        """
+        Run the enclosed block within the concurrency cap.
+
+        Args:
+            user (Hashable): Identity requests are balanced across.
+            weight (float): Share of the capacity relative to other users.
+
+        Raises:
+            Overloaded: If the call is shed.
+        """
+        if not self.policy.enabled:
+            yield
+            return
+
+        await self._acquire(user=user, weight=weight)
+        self._export()
+
+        try:
+            yield
+
+        finally:
+            self._release()
+            self._export()
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Callable
+
+
+class Metrics:
+    """
+    In-process registry of counters, gauges and timing summaries.
+
+    Series are identified by a name and optional labels and rendered
+    Prometheus-style, e.g. 'retries_total{scope=Chat}'.
+    """
+
+    def __init__(self):
+        self.counters: dict[str, float] = defaultdict(float)
+        self.gauges: dict[str, float] = {}
+        self.summaries: dict[str, tuple[int, float, float]] = {}
+        self.watches: dict[str, Callable[[], float | None]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str | int | float]) -> str:
+        """
+        Build the series key from a metric name and its labels.
+        """
+        if not labels:
+            return name
+
+        return name + "{" + ",".join(f"{key}={value}" for key, value in sorted(labels.items())) + "}"
+
+    def increment(self, name: str, value: int | float = 1, **labels) -> None:
+        """
+        Add value to a counter.
+
+        Args:
+            name (str): Counter name.
+            value (int | float): Increment, defaults to 1.
+            **labels: Series labels.
+        """
+        self.counters[self._key(name, labels)] += value
+
+    def set(self, name: str, value: int | float, **labels) -> None:
+        """
+        Set a gauge to the given value.
+
+        Args:
+            name (str): Gauge name.
+            value (int | float): Current value.
+            **labels: Series labels.
+        """
+        self.gauges[self._key(name, labels)] = value
+
+    def watch(self, name: str, callback: Callable[[], float | None], **labels) -> None:
+        """
+        Register a gauge computed when the snapshot is taken.
+
+        Args:
+            name (str): Gauge name.
+            callback (Callable): Returns the current value, None to omit the series.
+            **labels: Series labels.
+        """
+        self.watches[self._key(name, labels)] = callback
+
+    def observe(self, name: str, value: int | float, **labels) -> None:
+        """
+        Record a sample into a count / sum / max summary.
+
+        Args:
+            name (str): Summary name.
+            value (int | float): Observed sample, usually seconds.
+            **labels: Series labels.
+        """
+        key = self._key(name, labels)
+        count, total, peak = self.summaries.get(key, (0, 0.0, 0.0))
+        self.summaries[key] = (count + 1, total + value, max(peak, value))
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Flatten every series into a single name -> value mapping.
+
+        Returns:
+            dict[str, float]: Counters, gauges and expanded summaries.
+        """
+        snapshot = {**self.counters, **self.gauges}
+
+        for key, callback in self.watches.items():
+            value = callback()
+
+            if value is not None:
+                snapshot[key] = value
+
+        for key, (count, total, peak) in self.summaries.items():
+            name, _, labels = key.partition("{")
+            labels = "{" + labels if labels else ""
+
+            snapshot[f"{name}_count{labels}"] = count
+            snapshot[f"{name}_avg{labels}"] = total / count
+            snapshot[f"{name}_max{labels}"] = peak
+
+        return snapshot
@@ -1,12 +1,61 @@
+import asyncio
+import copy
+import hashlib
+import json
 import os
-import requests
-from typing import Self
+import time
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Self, TypeVar
 
-from groq import Groq
+import httpx
 
+from telegram_gpt.breakers import CircuitBreaker, CircuitOpen
+from telegram_gpt.caches import SimilarityCache, SingleFlight, TTLCache
 from telegram_gpt.constants import MODELS_LIST, DEFAULT_MODEL, DEFAULT_PROMPT
+from telegram_gpt.credentials import AUTH_STATUSES, KeyPool, NoCredentials
+from telegram_gpt.deadlines import deadline, remaining
+from telegram_gpt.latency import Hedger, Router
+from telegram_gpt.limiters import Bulkhead, Overloaded, RateLimited, RateLimiter
 from telegram_gpt.logger import Logger
-from telegram_gpt.structures import Model, Settings, Prompt
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.probes import PROBE_PROMPT, Prober, billed
+from telegram_gpt.retries import Retrier, StreamInterrupted, failover, headers_of, outage, status_of
+from telegram_gpt.structures import (
+    Completion, Model, ModelCatalog, ProbeStats, Route, Settings, Prompt, estimate_tokens
+)
+from telegram_gpt.triage import classify
+
+
+T = TypeVar('T')
+
+
+class Prefetched:
+    """
+    Completion stream whose first chunk was already received.
+
+    Owns the underlying stream and closes it directly, so a stream that is
+    never iterated, like the loser of a hedge race, still releases its connection.
+    """
+
+    def __init__(self, first: Any, stream: Any):
+        self.first = first
+        self.stream = stream
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.first is not None:
+            first, self.first = self.first, None
+            return first
+
+        return await self.stream.__anext__()
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying stream and its HTTP response.
+        """
+        await self.stream.close()
 
 
 class Plug:
@@ -28,32 +77,398 @@ class GPTPlug(Plug):
     """
     module = 'GPT Plug'
 
-    def __init__(self, logger: Logger, token: str):
+    def __init__(self, logger: Logger, tokens: list[str], settings: Settings):
         super().__init__(logger=logger)
-        self.token = token
+        self.models = ModelCatalog()
+        self.catalog_policy = settings.catalog
+        self.fetched: float | None = None
+        self.version = 0
+        self.digest: str | None = None
+        self.validators: dict[str, str] = {}
+        self.loading: asyncio.Task | None = None
+        self.refreshing: asyncio.Task | None = None
+        self.refresher: asyncio.Task | None = None
+
+        self.metrics = Metrics()
+        self.retrier = Retrier(logger=logger, metrics=self.metrics, policy=settings.retry)
+        self.hedger = Hedger(policy=settings.hedge, metrics=self.metrics)
+        self.router = Router(policy=settings.routing, metrics=self.metrics)
+        self.prober = Prober(
+            logger=logger,
+            metrics=self.metrics,
+            policy=settings.probe,
+            sample=self._sample,
+            catalog=lambda: self.models.ids()
+        )
+        self.limiter = RateLimiter(logger=logger, metrics=self.metrics, policy=settings.ratelimit)
+        self.cache_policy = settings.cache
+        self.cache = TTLCache(
+            max_entries=settings.cache.max_entries,
+            max_bytes=settings.cache.max_bytes,
+            ttl=settings.cache.ttl
+        )
+        self.similar = SimilarityCache(
+            threshold=settings.similar.threshold,
+            max_entries=settings.similar.max_entries,
+            ttl=settings.similar.ttl
+        )
+        self.flights = SingleFlight(logger=logger)
+        self.bulkhead = Bulkhead(logger=logger, metrics=self.metrics, policy=settings.concurrency)
+        self.breaker = CircuitBreaker(logger=logger, metrics=self.metrics, policy=settings.breaker, probe=self._ping)
+        self.keys = KeyPool(
+            logger=logger,
+            metrics=self.metrics,
+            limiter=self.limiter,
+            tokens=tokens,
+            upstream=settings.upstream
+        )
 
-        self.models_list()
+        self.metrics.watch('catalog_age_seconds', self.age)
+        self.restore()
 
-    def models_list(self) -> list[Model]:
+    async def start(self) -> None:
         """
-        Fetch the list of available models from Groq API and return validated Model objects.
+        Begin loading the catalog in the background once the event loop is running.
+
+        Returns immediately, so updates are served while the Groq API is still being reached.
+        """
+        self.loading = asyncio.ensure_future(self._load())
+
+    async def _load(self) -> None:
+        """
+        Warm the connection pools, fetch the initial models list, then start background
+        catalog refreshes and probing. Logs how long each phase took.
+        """
+        started = time.monotonic()
+
+        try:
+            await self.keys.warm(MODELS_LIST)
+            warmed = time.monotonic()
+
+            await self.refresh()
+            fetched = time.monotonic()
+
+        finally:
+            self.refresher = asyncio.ensure_future(self._refresh_loop())
+            self.prober.start()
+
+        self.metrics.set('startup_seconds', warmed - started, phase='warm')
+        self.metrics.set('startup_seconds', fetched - warmed, phase='catalog')
+        self.logger.info(
+            module=self.module,
+            scope='Startup',
+            message=f"Background startup took {fetched - started:.2f}s: warm-up {warmed - started:.2f}s, "
+                    f"catalog {fetched - warmed:.2f}s with {len(self.models)} models"
+        )
+
+    async def ready(self, timeout: float) -> bool:
+        """
+        Wait for the initial catalog load unless a catalog, e.g. a restored snapshot, is already available.
+
+        Args:
+            timeout (float): Maximum wait in seconds.
 
         Returns:
-            list[Model]: A list of usable model instances.
+            bool: True if a catalog is available.
+        """
+        if self.fetched is None and self.loading is not None and not self.loading.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self.loading), timeout)
+
+            except TimeoutError:
+                self.logger.warning(
+                    module=self.module,
+                    scope='Startup',
+                    message=f"Model catalog still loading after {timeout}s"
+                )
+
+            except Exception as e:
+                self.logger.warning(
+                    module=self.module,
+                    scope='Startup',
+                    message=f"Model catalog failed to load: {e!r}"
+                )
+
+        return self.fetched is not None
+
+    async def close(self) -> None:
+        """
+        Stop background work and close the connection pools.
+        """
+        self.breaker.stop()
+        self.prober.stop()
+
+        for task in (self.loading, self.refresher, self.refreshing):
+            if task is not None:
+                task.cancel()
+        await self.keys.close()
+
+    async def _ping(self) -> bool:
+        """
+        Cheap health check against the models endpoint, spending no tokens.
+
+        Returns:
+            bool: True if the API answered without a server error.
+        """
+        credential = self.keys.pick()
+        response = await credential.http.get(MODELS_LIST, headers=credential.headers)
+        return response.status_code < 500
+
+    async def _sample(self, model: str) -> tuple[float, float, int | None]:
+        """
+        Send a minimal streamed completion to measure a model's latency.
+
+        Probe outcomes feed latency routing but not the circuit breaker,
+        so an idle broken model does not cut off user traffic.
+
+        Returns:
+            tuple[float, float, int | None]: (time-to-first-token, total time) in seconds
+            and the billed tokens reported with the last chunk, if any.
+        """
+        credential = self.keys.pick(model)
+        cost = self.prober.cost
+
+        await self.limiter.acquire(key=credential.label, model=model, tokens=cost)
+        started = time.monotonic()
+
+        try:
+            raw = await credential.client.chat.completions.with_raw_response.create(
+                messages=[{"role": "user", "content": PROBE_PROMPT}],
+                model=model,
+                temperature=0,
+                max_tokens=self.prober.policy.max_tokens,
+                stream=True,
+                timeout=self.prober.policy.timeout,
+            )
+
+        except Exception as e:
+            self.limiter.learn(key=credential.label, model=model, headers=headers_of(e))
+            self.keys.report(credential, status_of(e))
+            raise
+
+        self.limiter.learn(key=credential.label, model=model, headers=raw.headers)
+        chat = await raw.parse()
+        tokens = None
+
+        try:
+            chunk = await anext(chat, None)
+            ttft = time.monotonic() - started
+
+            while chunk is not None:
+                tokens = billed(chunk) or tokens
+                chunk = await anext(chat, None)
+
+        finally:
+            await chat.close()
+
+        self.router.observe_ttft(model, ttft)
+        return ttft, time.monotonic() - started, tokens
+
+    def probes(self) -> list[ProbeStats]:
+        """
+        Recent probe results per model, fastest first.
+        """
+        return self.prober.table()
+
+    def age(self) -> float | None:
+        """
+        Seconds since the catalog was last fetched, None if it never was.
+        """
+        return None if self.fetched is None else time.monotonic() - self.fetched
+
+    def revalidate(self) -> asyncio.Task:
+        """
+        Refresh the catalog in the background, joining a refresh already running.
+
+        Returns:
+            asyncio.Task: The refresh task.
+        """
+        if self.refreshing is None or self.refreshing.done():
+            self.refreshing = asyncio.ensure_future(self.refresh())
+
+        return self.refreshing
+
+    async def _refresh_loop(self) -> None:
+        """
+        Refresh the catalog whenever it expires, retrying sooner after failures.
+        """
+        while True:
+            age = self.age()
+            expired = age is None or age >= self.catalog_policy.ttl
+
+            await asyncio.sleep(self.catalog_policy.retry if expired else self.catalog_policy.ttl - age)
+
+            try:
+                await self.revalidate()
+
+            except Exception as e:
+                self.logger.warning(
+                    module=self.module,
+                    scope='Refresh models',
+                    message=f"Catalog refresh failed with {e!r}"
+                )
+
+    def models_list(self) -> ModelCatalog:
+        """
+        Return the cached model catalog without waiting on the network.
+
+        An expired catalog keeps being served while a background refresh runs,
+        and stays in place when the refresh fails.
+
+        Returns:
+            ModelCatalog: Usable model instances.
+        """
+        age = self.age()
+
+        if age is None or age >= self.catalog_policy.ttl:
+            self.revalidate()
+
+        return self.models
+
+    def restore(self) -> bool:
+        """
+        Load the catalog snapshot written by the last successful refresh.
+
+        Models in the snapshot were validated when fetched, its validators make
+        the first refresh conditional.
+
+        Returns:
+            bool: True if a snapshot was restored.
+        """
+        path = self.catalog_policy.snapshot
+
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+
+            models = [Model(**record) for record in snapshot['models']]
+            age = max(time.time() - snapshot['fetched'], 0.0)
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(
+                module=self.module,
+                scope='Restore models',
+                message=f"Ignoring unreadable catalog snapshot '{path}': {e!r}"
+            )
+
+            return False
+
+        self.models = ModelCatalog(models)
+        self.fetched = time.monotonic() - age
+        self.digest = snapshot.get('digest')
+        self.validators = snapshot.get('validators', {})
+        self.version += 1
+
+        self.logger.info(
+            module=self.module,
+            scope='Restore models',
+            message=f"Restored {len(models)} models from a {age:.0f}s old snapshot"
+        )
+
+        return True
+
+    def persist(self) -> None:
+        """
+        Atomically write the current catalog to the snapshot file.
+        """
+        path = self.catalog_policy.snapshot
+
+        if not path or self.fetched is None:
+            return
+
+        snapshot = {
+            'fetched': time.time() - self.age(),
+            'digest': self.digest,
+            'validators': self.validators,
+            'models': [asdict(model) for model in self.models]
+        }
+
+        try:
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+
+            os.replace(f"{path}.tmp", path)
+
+        except OSError as e:
+            self.logger.warning(
+                module=self.module,
+                scope='Persist models',
+                message=f"Unable to write catalog snapshot '{path}': {e!r}"
+            )
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the list of available models from Groq API and replace the catalog with validated Model objects.
+
+        The request is conditional on the ETag / Last-Modified of the previous response.
+        When the upstream ignores that, an unchanged payload is detected by its hash.
+        Either way an unchanged catalog is neither re-parsed nor re-validated and keeps its version.
+
+        Returns:
+            bool: True if the catalog was refreshed.
         """
         scope = 'List models'
 
-        headers = {"Authorization": f"Bearer {self.token}"}
-        response = requests.get(MODELS_LIST, headers=headers)
+        async def fetch() -> httpx.Response:
+            while True:
+                credential = self.keys.pick()
+                response = await credential.http.get(MODELS_LIST, headers={**credential.headers, **self.validators})
+
+                if response.status_code in AUTH_STATUSES and self.keys.report(credential, response.status_code):
+                    continue
+
+                if response.status_code == 304:
+                    return response
+
+                response.raise_for_status()
+                return response
+
+        try:
+            response = await self.retrier.run(fetch, scope=scope)
+
+        except NoCredentials as e:
+            self.logger.error(
+                module=self.module,
+                scope=scope,
+                message=str(e)
+            )
+
+            self.metrics.increment('catalog_refreshes_total', outcome='failed')
+            return False
 
-        if response.status_code != 200:
+        except httpx.HTTPStatusError as e:
             self.logger.warning(
                 module=self.module,
                 scope=scope,
-                message=f"Response code '{response.status_code}' from groq API"
+                message=f"Response code '{e.response.status_code}' from groq API"
             )
 
-            return []
+            self.metrics.increment('catalog_refreshes_total', outcome='failed')
+            return False
+
+        except httpx.HTTPError as e:
+            self.logger.warning(
+                module=self.module,
+                scope=scope,
+                message=f"Unable to reach groq API: {e!r}"
+            )
+
+            self.metrics.increment('catalog_refreshes_total', outcome='failed')
+            return False
+
+        digest = hashlib.sha256(response.content).hexdigest() if response.status_code != 304 else self.digest
+
+        if digest == self.digest and self.fetched is not None:
+            self.fetched = time.monotonic()
+            self.persist()
+            self.metrics.increment(
+                'catalog_refreshes_total',
+                outcome='not_modified' if response.status_code == 304 else 'unchanged'
+            )
+            return True
 
         self.logger.debug(
             module=self.module,
@@ -70,7 +485,8 @@ class GPTPlug(Plug):
                 message="Failed to parse response from groq API"
             )
 
-            return []
+            self.metrics.increment('catalog_refreshes_total', outcome='failed')
+            return False
 
         models = [
             Model(
@@ -84,56 +500,497 @@ class GPTPlug(Plug):
             for model in data if model.get('active')
         ]
 
-        self.models = [model for model in models if model.clean_and_validate(logger=self.logger)]
-        return self.models
+        self.models = ModelCatalog(model for model in models if model.clean_and_validate(logger=self.logger))
+        self.fetched = time.monotonic()
+        self.digest = digest
+        self.version += 1
+        self.validators = {
+            header: response.headers[source]
+            for header, source in (('If-None-Match', 'etag'), ('If-Modified-Since', 'last-modified'))
+            if source in response.headers
+        }
+
+        self.persist()
+        self.metrics.increment('catalog_refreshes_total', outcome='fetched')
+        return True
+
+    def fallbacks(self, settings: Settings, query: str | None = None) -> list[str]:
+        """
+        Build the ordered chain of models to try for a completion.
+
+        With triage enabled, simple queries start with the small model. Otherwise, when
+        routing is configured, the chain starts with the routed model. Either is followed
+        by the configured one. Models missing from the fetched catalog are skipped.
+
+        Args:
+            settings (Settings): Current configuration.
+            query (str, optional): User query, used for triage.
+
+        Returns:
+            list[str]: Configured model followed by its usable fallbacks.
+        """
+        known = self.models
+        chain = []
+
+        if settings.triage.enabled and query is not None:
+            tier, signal = classify(query, settings.triage)
+            self.metrics.increment('triage_total', tier=tier, signal=signal)
 
-    def connect(self) -> Groq:
+            if tier == 'small' and (not known or settings.triage.model in known):
+                chain.append(settings.triage.model)
+
+        routable = self.routable(settings)
+
+        if not chain and routable:
+            chain.append(self.router.choose(routable))
+
+        if settings.model not in chain:
+            chain.append(settings.model)
+
+        for model in settings.fallbacks:
+            if known and model not in known:
+                self.logger.debug(
+                    module=self.module,
+                    scope='Fallbacks',
+                    message=f"Skipping unknown fallback model '{model}'"
+                )
+
+            elif model not in chain:
+                chain.append(model)
+
+        return chain
+
+    def routable(self, settings: Settings) -> list[str]:
+        """
+        Models configured for latency routing that the fetched catalog knows.
+        """
+        return [model for model in settings.routing.models if not self.models or model in self.models]
+
+    def routes(self, settings: Settings) -> list[Route]:
+        """
+        Latency estimates of the routed models, fastest first.
         """
-        Initialize or return an existing Groq client.
+        return self.router.table(self.routable(settings))
+
+    def max_tokens(self, model: str, settings: Settings, prompt_tokens: int) -> int:
+        """
+        Size the completion so that it fits the model limits and a single Telegram reply.
+
+        The /models set override or the reply budget is clamped by the model's
+        max_completion_tokens and by what is left of its context window.
+
+        Args:
+            model (str): Target model.
+            settings (Settings): Current configuration.
+            prompt_tokens (int): Estimated size of the system prompt and query.
 
         Returns:
-            Groq: A connected Groq client instance.
+            int: max_tokens for the request.
         """
-        return self.client if hasattr(self, 'client') else Groq(api_key=self.token)
+        limits = [settings.max_tokens or settings.reply_budget]
+        metadata = self.models.get(model)
+        window = self.models.context_window(model)
 
-    def chat(self, query: str, settings: Settings, prompt: Prompt) -> tuple[bool, str | None]:
+        if metadata is not None and metadata.max_completion_tokens:
+            limits.append(metadata.max_completion_tokens)
+
+        if window:
+            limits.append(window - prompt_tokens)
+
+        return max(min(limits), 1)
+
+    def invalidate(self) -> None:
         """
-        Perform a chat completion using Groq API.
+        Drop cached completions after settings or prompt changed.
+        """
+        self.cache.clear()
+        self.similar.clear()
+        self.metrics.set('cache_entries', 0, cache='exact')
+        self.metrics.set('cache_bytes', 0, cache='exact')
+        self.metrics.set('cache_entries', 0, cache='similar')
+
+        self.logger.debug(
+            module=self.module,
+            scope='Cache',
+            message="Completion cache invalidated"
+        )
+
+    @staticmethod
+    def _key(query: str, settings: Settings, prompt: Prompt) -> str:
+        """
+        Hash every input of a completion.
+        """
+        payload = json.dumps([
+            settings.model, settings.fallbacks, settings.temperature, settings.top_p,
+            settings.frequency_penalty, settings.presence_penalty, settings.max_tokens,
+            settings.reply_budget, prompt.text, query
+        ])
+
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_key(self, query: str, settings: Settings, prompt: Prompt) -> str | None:
+        """
+        Hash the inputs of a deterministic completion.
+
+        Returns:
+            str | None: Cache key, or None when caching does not apply.
+        """
+        if not self.cache_policy.enabled or settings.temperature != 0:
+            return None
+
+        return self._key(query=query, settings=settings, prompt=prompt)
+
+    @staticmethod
+    def _context_key(settings: Settings, prompt: Prompt) -> str:
+        """
+        Hash everything except the query, partitioning the near-duplicate cache.
+        """
+        payload = json.dumps([
+            settings.model, settings.fallbacks, settings.temperature, settings.top_p,
+            settings.frequency_penalty, settings.presence_penalty, settings.max_tokens,
+            settings.reply_budget, prompt.text
+        ])
+
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def chat(self, query: str, settings: Settings, prompt: Prompt,
+                   on_delta: Callable[[str], Awaitable[None]] | None = None,
+                   chat_id: int | None = None, user: int | None = None, weight: float = 1.0) -> Completion:
+        """
+        Perform a chat completion using Groq API without blocking the event loop.
+
+        Deterministic requests (temperature 0) are served from the completion cache when possible.
+        Chats listed in the 'similar' settings are also served answers to near-duplicate queries.
+        Identical requests in flight at the same time share a single upstream call.
+        Upstream calls are capped by the concurrency settings, excess requests queue
+        for a bounded time, scheduled fairly across users, and are shed once the queue is full.
+        The whole request is bounded by the configured deadline, which is also
+        propagated to retries and HTTP timeouts.
 
         Args:
             query (str): The user prompt.
             settings (Settings): Model and generation parameters.
             prompt (Prompt): System prompt.
+            on_delta (Callable, optional): Coroutine called with the accumulated text
+                every time a new chunk arrives. Enables streaming when provided.
+            chat_id (int, optional): Telegram chat the request comes from.
+            user (int, optional): Telegram user queued requests are balanced across.
+            weight (float): Scheduling weight of the user.
 
         Returns:
-            tuple[bool, str | None]: (success status, response text or None)
+            Completion: Response text and the model that produced it.
         """
-        self.client = self.connect()
+        fuzzy = chat_id is not None and chat_id in settings.similar.chats
+        context = self._context_key(settings=settings, prompt=prompt) if fuzzy else None
+
+        if fuzzy:
+            found = self.similar.get(context, query)
+            self.metrics.increment('cache_hits_total' if found else 'cache_misses_total', cache='similar')
+
+            if found:
+                cached, _ = found
+
+                if on_delta is not None:
+                    await on_delta(cached.text)
+
+                return cached
+
+        key = self._cache_key(query=query, settings=settings, prompt=prompt)
+
+        if key is not None:
+            cached = self.cache.get(key)
+            self.metrics.increment('cache_hits_total' if cached else 'cache_misses_total', cache='exact')
+
+            if cached:
+                if on_delta is not None:
+                    await on_delta(cached.text)
+
+                return cached
+
+        if not self.breaker.available():
+            self.metrics.increment('circuit_rejections_total')
+            return Completion(success=False, model=settings.model, reason='circuit')
 
         try:
-            chat = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": prompt.text},
-                    {"role": "user", "content": query},
-                ],
-
-                model=settings.model,
-                temperature=settings.temperature,
-                frequency_penalty=settings.frequency_penalty,
-                presence_penalty=settings.presence_penalty,
-                top_p=settings.top_p,
-            )
+            async with deadline(settings.deadline.timeout):
+                completion, shared = await self.flights.do(
+                    self._key(query=query, settings=settings, prompt=prompt),
+                    lambda delta: self._bounded(query=query, settings=settings, prompt=prompt, on_delta=delta,
+                                                user=user, weight=weight),
+                    on_delta=on_delta
+                )
 
-            return True, chat.choices[0].message.content.strip()
+        except Overloaded:
+            return Completion(success=False, model=settings.model, reason='busy')
 
-        except Exception as e:
+        except TimeoutError:
+            self.metrics.increment('deadline_exceeded_total')
             self.logger.warning(
                 module=self.module,
                 scope='Chat',
-                message="Unable to connect to groq API or API returned an error"
+                message=f"Completion exceeded its {settings.deadline.timeout}s deadline"
             )
 
-            return False, None
+            return Completion(success=False, model=settings.model, reason='deadline')
+
+        if shared:
+            self.metrics.increment('coalesced_total')
+
+        if key is not None and completion.success and not shared:
+            self.cache.put(key, completion, size=len(completion.text.encode()) + len(key))
+            self.metrics.set('cache_entries', len(self.cache), cache='exact')
+            self.metrics.set('cache_bytes', self.cache.size, cache='exact')
+
+        if fuzzy and completion.success:
+            self.similar.put(context, query, completion)
+            self.metrics.set('cache_entries', len(self.similar), cache='similar')
+
+        return completion
+
+    async def _bounded(self, query: str, settings: Settings, prompt: Prompt,
+                       on_delta: Callable[[str], Awaitable[None]] | None = None,
+                       user: int | None = None, weight: float = 1.0) -> Completion:
+        """
+        Run the fallback chain within the concurrency cap, queued fairly per user.
+
+        Raises:
+            Overloaded: If the request is shed.
+        """
+        async with self.bulkhead.slot(user=user, weight=weight):
+            return await self._failover(query=query, settings=settings, prompt=prompt, on_delta=on_delta)
+
+    async def _failover(self, query: str, settings: Settings, prompt: Prompt,
+                        on_delta: Callable[[str], Awaitable[None]] | None = None) -> Completion:
+        """
+        Complete along the fallback chain, moving on after rate limiting,
+        server errors or unknown models.
+
+        Returns:
+            Completion: Response text and the model that produced it.
+        """
+        chain = self.fallbacks(settings, query)
+
+        for index, model in enumerate(chain):
+            try:
+                text, served = await self.retrier.run(
+                    lambda: self._complete(model=model, query=query, settings=settings,
+                                           prompt=prompt, on_delta=on_delta),
+                    scope='Chat'
+                )
+
+                self.metrics.increment('completions_total', model=served)
+                return Completion(success=True, text=text, model=served, fallback=served != chain[0])
+
+            except CircuitOpen:
+                return Completion(success=False, model=model, reason='circuit')
+
+            except Exception as e:
+                if index + 1 < len(chain) and (failover(e) or isinstance(e, RateLimited)):
+                    self.metrics.increment('failovers_total', source=model, target=chain[index + 1])
+                    self.logger.warning(
+                        module=self.module,
+                        scope='Chat',
+                        message=f"Model '{model}' failed with {e!r}, failing over to '{chain[index + 1]}'"
+                    )
+
+                    continue
+
+                self.logger.warning(
+                    module=self.module,
+                    scope='Chat',
+                    message="Unable to connect to groq API or API returned an error"
+                )
+
+                return Completion(success=False, model=model)
+
+    async def _complete(self, model: str, query: str, settings: Settings, prompt: Prompt,
+                        on_delta: Callable[[str], Awaitable[None]] | None = None) -> tuple[str, str]:
+        """
+        Run a single, possibly hedged, completion attempt.
+
+        Returns:
+            tuple[str, str]: (response text, model that won the hedge race)
+
+        Raises:
+            StreamInterrupted: If a stream fails after text was handed to on_delta.
+        """
+        stream = on_delta is not None
+
+        chat, model = await self._hedge(
+            lambda model: self._open(model=model, query=query, settings=settings, prompt=prompt, stream=stream),
+            model=model
+        )
+
+        if not stream:
+            # Groq reports generation time alongside token usage
+            usage = getattr(chat, 'usage', None)
+            served = getattr(chat, 'model', None) or model
+
+            if usage is not None and getattr(usage, 'completion_time', None):
+                self.router.observe_rate(model=served, tokens=usage.completion_tokens, seconds=usage.completion_time)
+
+            return chat.choices[0].message.content.strip(), model
+
+        text, served = "", model
+        started = time.monotonic()
+
+        try:
+            async for chunk in chat:
+                served = getattr(chunk, 'model', None) or served
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+
+                if delta:
+                    text += delta
+                    await on_delta(text)
+
+        except Exception as e:
+            if text:
+                raise StreamInterrupted(f"Stream failed after {len(text)} characters") from e
+
+            raise
+
+        finally:
+            await chat.aclose()
+
+        self.router.observe_rate(model=served, tokens=estimate_tokens(text), seconds=time.monotonic() - started)
+        return text.strip(), model
+
+    async def _open(self, model: str, query: str, settings: Settings, prompt: Prompt, stream: bool) -> Any:
+        """
+        Send a completion request and wait for its first byte.
+
+        Returns:
+            Any: The finished completion, or for streams an iterator that
+            replays the already received first chunk.
+        """
+        prompt_tokens = estimate_tokens(prompt.text) + estimate_tokens(query)
+        max_tokens = self.max_tokens(model=model, settings=settings, prompt_tokens=prompt_tokens)
+
+        while True:
+            credential = self.keys.pick(model)
+
+            await self.limiter.acquire(
+                key=credential.label,
+                model=model,
+                tokens=prompt_tokens + min(max_tokens, self.limiter.policy.completion_estimate)
+            )
+
+            if not self.breaker.allow():
+                raise CircuitOpen("Groq API circuit is open")
+
+            started = time.monotonic()
+
+            try:
+                raw = await credential.client.chat.completions.with_raw_response.create(
+                    messages=[
+                        {"role": "system", "content": prompt.text},
+                        {"role": "user", "content": query},
+                    ],
+
+                    model=model,
+                    temperature=settings.temperature,
+                    frequency_penalty=settings.frequency_penalty,
+                    presence_penalty=settings.presence_penalty,
+                    top_p=settings.top_p,
+                    max_tokens=max_tokens,
+                    stream=stream,
+                    **({'timeout': remaining()} if remaining() is not None else {}),
+                )
+
+            except Exception as e:
+                self.breaker.record(failed=outage(e))
+                self.limiter.learn(key=credential.label, model=model, headers=headers_of(e))
+
+                if self.keys.report(credential, status_of(e)):
+                    continue
+
+                raise
+
+            except BaseException:
+                self.breaker.release()
+                raise
+
+            break
+
+        self.breaker.record(failed=False)
+        self.limiter.learn(key=credential.label, model=model, headers=raw.headers)
+        chat = await raw.parse()
+
+        if stream:
+            try:
+                first = await anext(chat, None)
+
+            except BaseException:
+                await chat.close()
+                raise
+
+            chat = Prefetched(first=first, stream=chat)
+
+        self.hedger.record(model, time.monotonic() - started)
+        self.router.observe_ttft(model, time.monotonic() - started)
+        return chat
+
+    async def _hedge(self, opener: Callable[[str], Awaitable[T]], model: str) -> tuple[T, str]:
+        """
+        Race a duplicate request against a slow primary one. The first answer wins
+        and the other request is cancelled.
+
+        Args:
+            opener (Callable): Starts a request for the given model.
+            model (str): Model of the primary request.
+
+        Returns:
+            tuple[T, str]: (result of the winning request, model it was sent to)
+        """
+        delay = self.hedger.delay(model)
+        primary = asyncio.ensure_future(opener(model))
+        tasks = {primary}
+        models = {primary: model}
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+
+                if self.hedger.admit(hedged=not done):
+                    hedge = self.hedger.fallback(model)
+                    task = asyncio.ensure_future(opener(hedge))
+                    tasks.add(task)
+                    models[task] = hedge
+
+            errors = []
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    tasks.discard(task)
+
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+
+                    if task is not primary:
+                        self.metrics.increment('hedge_wins_total')
+
+                    return task.result(), models[task]
+
+            raise errors[0]
+
+        finally:
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(self._discard)
+
+    @staticmethod
+    def _discard(task: asyncio.Future) -> None:
+        """
+        Release the result of a request that lost a hedge race.
+        """
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if hasattr(task.result(), 'aclose'):
+            asyncio.ensure_future(task.result().aclose())
 
 
 class PropertyPlug(Plug):
@@ -142,6 +999,30 @@ class PropertyPlug(Plug):
 
     Provides loading, updating, saving, and resetting support.
     """
+    def __init__(self, logger: Logger, filepath: str = None):
+        super().__init__(logger=logger, filepath=filepath)
+        self.listeners = []
+
+    def subscribe(self, listener: Callable[[], None]) -> Self:
+        """
+        Register a callback fired whenever the configuration changes.
+
+        Args:
+            listener (Callable): Callback without arguments.
+
+        Returns:
+            Self: The PropertyPlug, for chaining.
+        """
+        self.listeners.append(listener)
+        return self
+
+    def _notify(self) -> None:
+        """
+        Fire change listeners.
+        """
+        for listener in self.listeners:
+            listener()
+
     def load(self, filepath: str | None = None) -> Self:
         """
         Load configuration from file or fall back to defaults.
@@ -163,16 +1044,28 @@ class PropertyPlug(Plug):
         Returns:
             dict: Mapping of updated fields to success status.
         """
+        previous = copy.deepcopy(self.configuration)
         response = self.configuration.update(logger=self.logger, **kwargs)
         self.configuration.save(self.filepath)
+
+        if self.configuration != previous:
+            self._notify()
+
         return response
 
+    def save(self) -> None:
+        """
+        Persist the current configuration without firing change listeners.
+        """
+        self.configuration.save(self.filepath)
+
     def preset(self) -> None:
         """
         Reset configuration to default values and save.
         """
         self.configuration = self.structure(self.default)
         self.configuration.save(self.filepath)
+        self._notify()
 
 
 class SettingsPlug(PropertyPlug):
@@ -183,6 +1076,17 @@ class SettingsPlug(PropertyPlug):
     structure = Settings
     default = DEFAULT_MODEL
 
+    def preset(self) -> None:
+        """
+        Reset the sampling parameters to their defaults and save.
+
+        Operator sections (upstream, retry, concurrency admins, similar chats, ...) are kept,
+        and the configuration is changed in place, so components holding its sections stay in sync.
+        """
+        self.configuration.preset(self.structure(self.default))
+        self.configuration.save(self.filepath)
+        self._notify()
+
 
 class PromptPlug(PropertyPlug):
     """
@@ -0,0 +1,167 @@
+import asyncio
+from collections import defaultdict, deque
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from telegram_gpt.logger import Logger
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Probe, ProbeStats, estimate_tokens
+
+
+PROBE_PROMPT = "ping"
+
+# Chat template tokens billed around every prompt, charged when usage is not reported
+PROBE_OVERHEAD = 64
+
+
+def billed(chunk: Any) -> int | None:
+    """
+    Total tokens billed for a stream, reported with its last chunk.
+
+    Groq sends usage in 'x_groq', OpenAI-style streams in 'usage'.
+
+    Returns:
+        int | None: Billed tokens, or None if the chunk carries no usage.
+    """
+    for usage in (getattr(getattr(chunk, 'x_groq', None), 'usage', None), getattr(chunk, 'usage', None)):
+        if usage is not None and getattr(usage, 'total_tokens', None):
+            return usage.total_tokens
+
+    return None
+
+
+class Prober:
+    """
+    Periodically sends a tiny completion to every catalogued model.
+
+    Each sweep spreads its probes evenly over the interval. Probes are only sent
+    while the tokens spent over the last hour stay within the configured budget.
+    A probe reserves a conservative cost up front, replaced by the usage the API
+    reports once it finishes.
+    """
+    module = 'Prober'
+
+    def __init__(self, logger: Logger, metrics: Metrics, policy: Probe,
+                 sample: Callable[[str], Awaitable[tuple[float, float, int | None]]],
+                 catalog: Callable[[], list[str]]):
+        self.logger = logger
+        self.metrics = metrics
+        self.policy = policy
+        self.sample = sample
+        self.catalog = catalog
+        self.task: asyncio.Task | None = None
+
+        self.history: dict[str, deque[tuple[float, float | None, float | None]]] = defaultdict(
+            lambda: deque(maxlen=policy.history)
+        )
+        self.spent: deque[list[float | int]] = deque()
+
+    @property
+    def cost(self) -> int:
+        """
+        Tokens a single probe may be billed, including the chat template overhead.
+        """
+        return estimate_tokens(PROBE_PROMPT) + PROBE_OVERHEAD + self.policy.max_tokens
+
+    def start(self) -> None:
+        """
+        Launch the background probe loop if enabled.
+        """
+        if self.policy.enabled and (self.task is None or self.task.done()):
+            self.task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        """
+        Cancel the background probe loop.
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+    def targets(self) -> list[str]:
+        """
+        Catalogued models that accept chat completions.
+        """
+        return [model for model in self.catalog() if not any(item in model for item in self.policy.exclude)]
+
+    def affordable(self) -> bool:
+        """
+        Check whether another probe fits into the hourly token budget.
+        """
+        now = time.monotonic()
+
+        while self.spent and self.spent[0][0] < now - 3600:
+            self.spent.popleft()
+
+        return sum(tokens for _, tokens in self.spent) + self.cost <= self.policy.budget
+
+    async def _run(self) -> None:
+        """
+        Sweep the catalog every interval.
+        """
+        while True:
+            targets = self.targets()
+            spacing = self.policy.interval / max(len(targets), 1)
+
+            for model in targets:
+                await self.probe(model)
+                await asyncio.sleep(spacing)
+
+            if not targets:
+                await asyncio.sleep(self.policy.interval)
+
+    async def probe(self, model: str) -> None:
+        """
+        Probe a single model and record the outcome.
+        """
+        if not self.affordable():
+            self.metrics.increment('probe_skipped_total', model=model)
+            return
+
+        reservation = [time.monotonic(), self.cost]
+        self.spent.append(reservation)
+
+        try:
+            async with asyncio.timeout(self.policy.timeout):
+                ttft, total, tokens = await self.sample(model)
+
+        except Exception as e:
+            self.history[model].append((time.monotonic(), None, None))
+            self.metrics.increment('probe_errors_total', model=model)
+            self.logger.debug(
+                module=self.module,
+                scope='Probe',
+                message=f"Probe of '{model}' failed with {e!r}"
+            )
+
+            return
+
+        if tokens:
+            reservation[1] = tokens
+
+        self.history[model].append((time.monotonic(), ttft, total))
+        self.metrics.increment('probes_total', model=model)
+        self.metrics.increment('probe_tokens_total', reservation[1], model=model)
+        self.metrics.set('probe_ttft_seconds', ttft, model=model)
+        self.metrics.set('probe_total_seconds', total, model=model)
+
+    def table(self) -> list[ProbeStats]:
+        """
+        Summarize the probe history per model, fastest median time-to-first-token first.
+        """
+        now = time.monotonic()
+        rows = []
+
+        for model, samples in self.history.items():
+            succeeded = [(ttft, total) for _, ttft, total in samples if ttft is not None]
+
+            rows.append(ProbeStats(
+                model=model,
+                samples=len(samples),
+                ttft=statistics.median(ttft for ttft, _ in succeeded) if succeeded else None,
+                total=statistics.median(total for _, total in succeeded) if succeeded else None,
+                error_rate=1 - len(succeeded) / len(samples) if samples else 0.0,
+                age=now - samples[-1][0] if samples else None
+            ))
+
+        return sorted(rows, key=lambda row: (row.ttft is None, row.ttft or 0.0))
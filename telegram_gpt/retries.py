@@ -0,0 +1,332 @@
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+import random
+import re
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import groq
+import httpx
+
+from telegram_gpt.deadlines import remaining
+from telegram_gpt.logger import Logger
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Retry
+
+
+T = TypeVar('T')
+
+RETRYABLE_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+RESET_HEADERS = ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens')
+FAILOVER_CODES = frozenset({'model_not_found', 'model_decommissioned'})
+
+
+class StreamInterrupted(Exception):
+    """
+    Raised when a streamed completion fails after tokens were already delivered.
+
+    Never retried: the user has seen part of the answer and tokens were spent.
+    """
+
+
+def status_of(error: Exception) -> int | None:
+    """
+    Extract the HTTP status code carried by a Groq or httpx error.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        int | None: Status code, or None for transport-level failures.
+    """
+    status = getattr(error, 'status_code', None)
+
+    if status is None and isinstance(getattr(error, 'response', None), httpx.Response):
+        status = error.response.status_code
+
+    return status
+
+
+def headers_of(error: Exception) -> httpx.Headers:
+    """
+    Extract response headers carried by a Groq or httpx error.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        httpx.Headers: Response headers, empty if there was no response.
+    """
+    response = getattr(error, 'response', None)
+    return response.headers if isinstance(response, httpx.Response) else httpx.Headers()
+
+
+def retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed call is worth repeating.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        bool: True for throttling, server errors and transport failures.
+    """
+    if isinstance(error, StreamInterrupted):
+        return False
+
+    if isinstance(error, (httpx.TransportError, groq.APIConnectionError)):
+        return True
+
+    return status_of(error) in RETRYABLE_STATUSES
+
+
+def outage(error: Exception) -> bool:
+    """
+    Decide whether a failure means the upstream itself is unhealthy.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        bool: True for server errors, timeouts and connection failures.
+    """
+    if isinstance(error, (httpx.TransportError, groq.APIConnectionError)):
+        return True
+
+    return (status_of(error) or 0) >= 500
+
+
+def error_code(error: Exception) -> str | None:
+    """
+    Extract the machine-readable error code from a Groq error body.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        str | None: Error code such as 'model_not_found', if any.
+    """
+    body = getattr(error, 'body', None)
+
+    if isinstance(body, dict):
+        body = body.get('error', body)
+
+    return body.get('code') if isinstance(body, dict) else None
+
+
+def failover(error: Exception) -> bool:
+    """
+    Decide whether a failed completion should move on to the next model in the chain.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        bool: True for rate limiting, server errors and unknown or retired models.
+    """
+    status = status_of(error) or 0
+    return status in (404, 429) or status >= 500 or error_code(error) in FAILOVER_CODES
+
+
+def parse_duration(value: str | None) -> float | None:
+    """
+    Parse Retry-After and Groq reset header values into seconds.
+
+    Accepts plain seconds ('7'), Go-style durations ('2m59.56s', '120ms')
+    and HTTP dates.
+
+    Args:
+        value (str | None): Raw header value.
+
+    Returns:
+        float | None: Delay in seconds, or None if the value is unusable.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+
+    if parts and "".join(number + unit for number, unit in parts) == value.strip():
+        scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def server_delay(error: Exception) -> float | None:
+    """
+    Read the delay requested by the server through Retry-After or x-ratelimit-reset-* headers.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        float | None: Requested delay in seconds, or None when the server gave no hint.
+    """
+    headers = headers_of(error)
+    delay = parse_duration(headers.get('retry-after'))
+
+    if delay is None and status_of(error) == 429:
+        resets = [parse_duration(headers.get(header)) for header in RESET_HEADERS]
+        resets = [reset for reset in resets if reset is not None]
+        delay = max(resets) if resets else None
+
+    return delay
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent calls so that retries cannot amplify an outage.
+
+    Within a sliding window, at most 'minimum + ratio * calls' retries are admitted.
+    """
+
+    def __init__(self, ratio: float, minimum: int, window: float):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+
+        self.calls: deque[float] = deque()
+        self.retries: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        """
+        Drop timestamps that fell out of the window.
+        """
+        for events in (self.calls, self.retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record(self) -> None:
+        """
+        Register a fresh (non-retry) call.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        self.calls.append(now)
+
+    def withdraw(self) -> bool:
+        """
+        Try to spend one retry from the budget.
+
+        Returns:
+            bool: True if the retry is allowed.
+        """
+        now = time.monotonic()
+        self._prune(now)
+
+        if len(self.retries) >= self.minimum + self.ratio * len(self.calls):
+            return False
+
+        self.retries.append(now)
+        return True
+
+
+class Retrier:
+    """
+    Runs async calls with exponential backoff, full jitter, server-requested
+    delays and a shared retry budget.
+    """
+    module = 'Retrier'
+
+    def __init__(self, logger: Logger, metrics: Metrics, policy: Retry):
+        self.logger = logger
+        self.metrics = metrics
+        self.policy = policy
+
+        self.budget = RetryBudget(
+            ratio=policy.budget_ratio,
+            minimum=policy.budget_minimum,
+            window=policy.budget_window
+        )
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """
+        Compute how long to wait before the next attempt.
+
+        Args:
+            attempt (int): Number of the attempt that just failed, starting at 1.
+            error (Exception): The failure.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        requested = server_delay(error)
+
+        if requested is not None:
+            return requested + random.uniform(0, self.policy.base_delay)
+
+        return random.uniform(0, min(self.policy.max_delay, self.policy.base_delay * 2 ** (attempt - 1)))
+
+    def _give_up(self, scope: str, reason: str, error: Exception) -> None:
+        """
+        Count and log an abandoned call.
+        """
+        self.metrics.increment('retry_give_ups_total', scope=scope, reason=reason)
+        self.logger.warning(
+            module=self.module,
+            scope=scope,
+            message=f"Giving up ({reason}) after {error!r}"
+        )
+
+    async def run(self, call: Callable[[], Awaitable[T]], scope: str) -> T:
+        """
+        Await call, retrying retryable failures.
+
+        Args:
+            call (Callable): Factory returning a fresh awaitable per attempt.
+            scope (str): Label used for logs and metrics.
+
+        Returns:
+            T: Result of the first successful attempt.
+
+        Raises:
+            Exception: The last failure once retries are exhausted or refused.
+        """
+        self.budget.record()
+
+        for attempt in range(1, self.policy.attempts + 1):
+            try:
+                return await call()
+
+            except Exception as e:
+                if not retryable(e):
+                    raise
+
+                if attempt == self.policy.attempts:
+                    self._give_up(scope, 'exhausted', e)
+                    raise
+
+                delay = self.delay(attempt, e)
+
+                if delay > self.policy.max_delay:
+                    self._give_up(scope, 'delay', e)
+                    raise
+
+                if remaining() is not None and delay >= remaining():
+                    self._give_up(scope, 'deadline', e)
+                    raise
+
+                if not self.budget.withdraw():
+                    self._give_up(scope, 'budget', e)
+                    raise
+
+                self.metrics.increment('retries_total', scope=scope, status=status_of(e) or 'transport')
+                self.logger.debug(
+                    module=self.module,
+                    scope=scope,
+                    message=f"Attempt {attempt} failed with {e!r}, retrying in {delay:.2f}s"
+                )
+
+                await asyncio.sleep(delay)
+
+        raise RuntimeError("Retry policy allows no attempts")
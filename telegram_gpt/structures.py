@@ -1,7 +1,8 @@
-from dataclasses import dataclass, asdict
+from collections import defaultdict
+from dataclasses import dataclass, asdict, field, fields, is_dataclass
 import logging
 import time
-from typing import Self
+from typing import Iterable, Iterator, Self
 
 import yaml
 
@@ -9,6 +10,13 @@ from telegram_gpt.logger import Logger
 from telegram_gpt.validators import Validators
 
 
+def estimate_tokens(text: str | None) -> int:
+    """
+    Roughly estimate the number of tokens in a text, about four characters per token.
+    """
+    return (len(text) + 3) // 4 if text else 0
+
+
 @dataclass
 class Model:
     """
@@ -77,6 +85,255 @@ class Model:
         return time.strftime('%d/%m/%Y', time.localtime(timestamp))
 
 
+class ModelCatalog:
+    """
+    Indexed collection of models.
+
+    Models are keyed by id, with secondary indexes by owner and by context window
+    bucket (the next power of two), so lookups do not scan the whole catalog.
+    Iteration keeps the order models were fetched in.
+    """
+
+    def __init__(self, models: Iterable[Model] = ()):
+        self.by_id: dict[str, Model] = {}
+        self.by_owner: dict[str | None, list[Model]] = defaultdict(list)
+        self.by_window: dict[int | None, list[Model]] = defaultdict(list)
+
+        for model in models:
+            self.by_id[model.model] = model
+            self.by_owner[model.owned_by].append(model)
+            self.by_window[self.bucket(model.context_window)].append(model)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __iter__(self) -> Iterator[Model]:
+        return iter(self.by_id.values())
+
+    def __contains__(self, model: str) -> bool:
+        return model in self.by_id
+
+    @staticmethod
+    def bucket(window: int | None) -> int | None:
+        """
+        Context window bucket, the smallest power of two holding the window.
+        """
+        return 1 << (window - 1).bit_length() if window else None
+
+    def get(self, model: str) -> Model | None:
+        """
+        Look a model up by id.
+        """
+        return self.by_id.get(model)
+
+    def ids(self) -> list[str]:
+        """
+        Ids of every model in the catalog.
+        """
+        return list(self.by_id)
+
+    def context_window(self, model: str) -> int | None:
+        """
+        Context window of a model, None if unknown.
+        """
+        metadata = self.by_id.get(model)
+        return metadata.context_window if metadata else None
+
+    def owned_by(self, owner: str) -> list[Model]:
+        """
+        Models published by an owner.
+        """
+        return list(self.by_owner.get(owner, []))
+
+    def fitting(self, tokens: int) -> list[Model]:
+        """
+        Models whose context window holds at least the given number of tokens.
+
+        Buckets above the one holding tokens are taken whole, only that bucket is checked model by model.
+        """
+        minimum = self.bucket(max(tokens, 1))
+
+        return [
+            model
+            for bucket, models in self.by_window.items() if bucket is not None and bucket >= minimum
+            for model in models if bucket > minimum or model.context_window >= tokens
+        ]
+
+
+@dataclass
+class Upstream:
+    """
+    Holds connection pool parameters shared by every Groq API call.
+    """
+    pool_size: int = 20
+    keepalive: int = 10
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    http2: bool = True
+    warm: int = 2
+    idle_ping: float = 30.0
+
+
+@dataclass
+class Retry:
+    """
+    Holds backoff and retry budget parameters for Groq API calls.
+    """
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    budget_ratio: float = 0.2
+    budget_minimum: int = 5
+    budget_window: float = 10.0
+
+
+@dataclass
+class Hedge:
+    """
+    Holds parameters for hedged chat completion requests.
+    """
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20
+    window: int = 200
+    max_rate: float = 0.1
+    model: str | None = None
+
+
+@dataclass
+class RateLimit:
+    """
+    Holds parameters for the client-side rate limiter.
+    """
+    enabled: bool = True
+    max_wait: float = 5.0
+    completion_estimate: int = 256
+
+
+@dataclass
+class Cache:
+    """
+    Holds bounds for the exact-match completion cache.
+    """
+    enabled: bool = True
+    max_entries: int = 1024
+    max_bytes: int = 4 * 1024 * 1024
+    ttl: float = 3600.0
+
+
+@dataclass
+class Similar:
+    """
+    Holds parameters for the near-duplicate query cache and the chats it is enabled for.
+    """
+    threshold: float = 0.9
+    max_entries: int = 2048
+    ttl: float = 3600.0
+    chats: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Breaker:
+    """
+    Holds trip and recovery parameters for the Groq API circuit breaker.
+    """
+    enabled: bool = True
+    failures: int = 5
+    error_rate: float = 0.5
+    min_requests: int = 20
+    window: float = 60.0
+    cooldown: float = 30.0
+    probes: int = 1
+
+
+@dataclass
+class Routing:
+    """
+    Holds the set of interchangeable models routed between by observed latency.
+
+    An empty model list disables routing.
+    """
+    models: list[str] = field(default_factory=list)
+    alpha: float = 0.3
+    explore: float = 0.05
+    reply_tokens: int = 256
+
+
+@dataclass
+class Triage:
+    """
+    Holds the thresholds for sending simple queries to a small, fast model.
+    """
+    enabled: bool = False
+    model: str = 'llama-3.1-8b-instant'
+    max_tokens: int = 48
+    max_lines: int = 3
+    code: bool = True
+    keywords: list[str] = field(default_factory=lambda: [
+        'explain', 'step by step', 'analyze', 'compare', 'prove', 'calculate', 'translate', 'summarize'
+    ])
+
+
+@dataclass
+class Probe:
+    """
+    Holds the schedule and token budget of background latency probes.
+    """
+    enabled: bool = False
+    interval: float = 600.0
+    timeout: float = 15.0
+    max_tokens: int = 1
+    budget: int = 2000
+    history: int = 20
+    exclude: list[str] = field(default_factory=lambda: ['whisper', 'tts', 'playai', 'orpheus', 'guard'])
+
+
+@dataclass
+class Catalog:
+    """
+    Holds the freshness policy of the cached model catalog and how long commands wait for its first load.
+    """
+    ttl: float = 600.0
+    retry: float = 60.0
+    wait: float = 10.0
+    snapshot: str | None = 'catalog.json'
+
+
+@dataclass
+class Concurrency:
+    """
+    Holds the cap on concurrent upstream completions and its fair wait queue.
+    """
+    enabled: bool = True
+    limit: int = 8
+    queue: int = 32
+    per_user: int = 3
+    max_wait: float = 10.0
+    admins: list[int] = field(default_factory=list)
+    admin_weight: float = 4.0
+
+
+@dataclass
+class Deadline:
+    """
+    Holds the end-to-end time budget of a /chat request.
+    """
+    timeout: float = 60.0
+    supersede: bool = True
+
+
+@dataclass
+class Streaming:
+    """
+    Holds how often a streamed reply is edited, in seconds.
+
+    Telegram allows about 20 messages per minute in a group, so group chats use a longer interval.
+    """
+    edit_interval: float = 1.0
+    group_edit_interval: float = 3.0
+
+
 @dataclass
 class Settings:
     """
@@ -87,9 +344,47 @@ class Settings:
     frequency_penalty: float = 0.0
     presence_penalty: float = 0.0
     top_p: float = 1.0
+    max_tokens: int | None = None
+    reply_budget: int = 1024
+    stream: bool = False
+    streaming: Streaming = field(default_factory=Streaming)
+    upstream: Upstream = field(default_factory=Upstream)
+    retry: Retry = field(default_factory=Retry)
+    hedge: Hedge = field(default_factory=Hedge)
+    ratelimit: RateLimit = field(default_factory=RateLimit)
+    cache: Cache = field(default_factory=Cache)
+    similar: Similar = field(default_factory=Similar)
+    breaker: Breaker = field(default_factory=Breaker)
+    concurrency: Concurrency = field(default_factory=Concurrency)
+    routing: Routing = field(default_factory=Routing)
+    triage: Triage = field(default_factory=Triage)
+    probe: Probe = field(default_factory=Probe)
+    catalog: Catalog = field(default_factory=Catalog)
+    deadline: Deadline = field(default_factory=Deadline)
+    fallbacks: list[str] = field(default_factory=list)
 
     module = 'Settings'
 
+    # Fields reset by /models default, everything else is operator configuration
+    sampling = ('model', 'temperature', 'frequency_penalty', 'presence_penalty', 'top_p', 'max_tokens')
+
+    def __post_init__(self) -> None:
+        """
+        Convert nested sections loaded from YAML into their dataclasses.
+        """
+        for section in fields(self):
+            value = getattr(self, section.name)
+
+            if isinstance(value, dict) and is_dataclass(section.default_factory):
+                setattr(self, section.name, section.default_factory(**value))
+
+    def preset(self, defaults: Self) -> None:
+        """
+        Reset the sampling parameters in place, keeping operator sections and the objects holding them.
+        """
+        for name in self.sampling:
+            setattr(self, name, getattr(defaults, name))
+
     def _update_model(self, logger: Logger, value: str, onloading: bool = False) -> bool:
         """
         Validate and optionally set model name.
@@ -143,6 +438,73 @@ class Settings:
     def _update_top(self, logger: Logger, value: int | float) -> bool:
         return self._validate_and_assign(logger, value, 'top_p', (0.0, 1.0), 1.0)
 
+    def _update_tokens(self, logger: Logger, value: int | float) -> bool:
+        """
+        Validate and set the max_tokens override, 0 restores automatic sizing.
+        """
+        status, result = self._validate_range(logger, (0, 1024 * 1024), value, 0, 'max_tokens')
+        self.max_tokens = int(result) or None
+
+        return status
+
+    def _parse_models(self, logger: Logger, value: str | list[str], models: ModelCatalog,
+                      scope: str) -> list[str] | None:
+        """
+        Validate a list of model names given as a list or a comma-separated string, 'none' meaning empty.
+        """
+        if Validators.validate_str(value):
+            value = [] if value.lower() == 'none' else [item.strip() for item in value.split(',') if item.strip()]
+
+        if not isinstance(value, list) or not all(Validators.validate_str(item) for item in value):
+            logger.warning(
+                module=self.module,
+                scope=scope,
+                message=f"Expected list of model names, got '{value}'"
+            )
+
+            return None
+
+        unknown = [item for item in value if models and item not in models]
+
+        if unknown:
+            logger.debug(
+                module=self.module,
+                scope=scope,
+                message=f"Unable to find models {unknown}"
+            )
+
+            return None
+
+        return value
+
+    def _update_fallbacks(self, logger: Logger, value: str | list[str], models: ModelCatalog) -> bool:
+        """
+        Validate and set the ordered fallback chain.
+
+        Accepts a list or a comma-separated string, 'none' clears the chain.
+        """
+        value = self._parse_models(logger, value, models, scope='Validate fallbacks')
+
+        if value is None:
+            return False
+
+        self.fallbacks = value
+        return True
+
+    def _update_routing(self, logger: Logger, value: str | list[str], models: ModelCatalog) -> bool:
+        """
+        Validate and set the models routed between by latency.
+
+        Accepts a list or a comma-separated string, 'none' disables routing.
+        """
+        value = self._parse_models(logger, value, models, scope='Validate routing')
+
+        if value is None:
+            return False
+
+        self.routing.models = value
+        return True
+
     def _validate_and_assign(self, logger: Logger, value: float, attr: str,
                              bounds: tuple[float, float], default: float) -> bool:
         """
@@ -172,12 +534,17 @@ class Settings:
             dict[str, tuple[bool, value]]: Map of update status per field.
         """
         response = {}
+        models = kwargs.get('models') or ModelCatalog()
 
         for attribute, value in kwargs.items():
             if attribute == 'models':
                 continue
 
-            if attribute != 'model':
+            if attribute in ('fallbacks', 'routing'):
+                method = getattr(self, f'_update_{attribute}')
+                response[attribute] = (method(logger, value, models), value)
+
+            elif attribute != 'model':
                 if Validators.validate_numeric(value):
                     value = round(float(value), 2)
                     method = getattr(self, f'_update_{attribute}', None)
@@ -194,8 +561,6 @@ class Settings:
                     response[attribute] = (False, value)
 
             else:
-                models = [model.model for model in kwargs.get('models', [])]
-
                 if not models or value in models:
                     response['model'] = (self._update_model(logger, value), value)
 
@@ -235,6 +600,43 @@ class Settings:
             return False, e
 
 
+@dataclass
+class Route:
+    """
+    Latency estimates of a routed model.
+    """
+    model: str
+    ttft: float | None = None
+    rate: float | None = None
+    score: float | None = None
+    picks: int = 0
+
+
+@dataclass
+class ProbeStats:
+    """
+    Summary of recent latency probes of a model.
+    """
+    model: str
+    samples: int = 0
+    ttft: float | None = None
+    total: float | None = None
+    error_rate: float = 0.0
+    age: float | None = None
+
+
+@dataclass
+class Completion:
+    """
+    Outcome of a chat completion request.
+    """
+    success: bool
+    text: str | None = None
+    model: str | None = None
+    fallback: bool = False
+    reason: str | None = None
+
+
 @dataclass
 class Prompt:
     """
@@ -1,9 +1,16 @@
-from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
+import asyncio
+from collections import defaultdict
+import time
+
+from telegram import Message, Update
+from telegram.constants import ChatType
+from telegram.error import RetryAfter, TelegramError
+from telegram.ext import Application, ApplicationBuilder, CommandHandler, ContextTypes
 
 from telegram_gpt.formatters import Formatters
 from telegram_gpt.logger import Logger
 from telegram_gpt.plugs import GPTPlug, SettingsPlug, PromptPlug
+from telegram_gpt.structures import Completion
 
 
 class TelegramBot:
@@ -28,17 +35,53 @@ class TelegramBot:
         self.gptplug = gptplug
         self.settingsplug = settingsplug
         self.promptplug = promptplug
+        self.generations: dict[int, set[asyncio.Task]] = defaultdict(set)
+        self.listing: tuple[int, str] | None = None
+        self.created = time.monotonic()
+
+        self.app = (
+            ApplicationBuilder()
+            .token(token)
+            .concurrent_updates(True)
+            .post_init(self._startup)
+            .post_shutdown(self._shutdown)
+            .build()
+        )
 
-        self.app = ApplicationBuilder().token(token).build()
         self._register_handlers()
 
+    async def _startup(self, application: Application) -> None:
+        """
+        Start plugs that need a running event loop without waiting on the Groq API.
+        """
+        await self.gptplug.start()
+
+        self.logger.info(
+            module='Telegram Bot',
+            scope='Startup',
+            message=f"Serving updates {time.monotonic() - self.created:.2f}s after setup, models load in background"
+        )
+
+    async def _shutdown(self, application: Application) -> None:
+        """
+        Cancel in-flight generations and release plug resources on shutdown.
+        """
+        for tasks in self.generations.values():
+            for task in tasks:
+                task.cancel()
+
+        await self.gptplug.close()
+
     def _register_handlers(self):
         """
         Register Telegram bot command handlers.
         """
         self.app.add_handler(CommandHandler("chat", self.chat))
+        self.app.add_handler(CommandHandler("stop", self.stop))
         self.app.add_handler(CommandHandler("models", self.models))
         self.app.add_handler(CommandHandler("prompt", self.prompt))
+        self.app.add_handler(CommandHandler("metrics", self.metrics))
+        self.app.add_handler(CommandHandler("similar", self.similar))
 
     def _log(self, update: Update, scope: str) -> None:
         """
@@ -57,15 +100,125 @@ class TelegramBot:
             )
         )
 
+    async def _edit(self, message: Message, text: str, final: bool = False) -> float:
+        """
+        Edit a previously sent message, tolerating Telegram rate limits.
+
+        Intermediate edits are dropped when Telegram asks to slow down,
+        the final edit waits for the requested delay and is retried once.
+
+        Args:
+            message (Message): Message to edit.
+            text (str): New MarkdownV2-formatted text.
+            final (bool): Whether this edit carries the complete reply.
+
+        Returns:
+            float: Seconds Telegram asked to wait before the next edit, 0.0 if none.
+        """
+        for _ in range(2 if final else 1):
+            try:
+                await message.edit_text(text, parse_mode='MarkdownV2')
+                return 0.0
+
+            except RetryAfter as e:
+                if not final:
+                    return e.retry_after
+
+                await asyncio.sleep(e.retry_after)
+
+            except TelegramError as e:
+                self.logger.debug(module='Telegram Bot', scope='Edit', message=f"Unable to edit message: {e}")
+                return 0.0
+
+        return 0.0
+
+    async def _generate(self, update: Update, **kwargs) -> Completion | None:
+        """
+        Run a completion as a task registered for the user, so /stop can cancel it.
+
+        A newer /chat from the same user supersedes the previous one when configured.
+        Users and chats listed as admins are scheduled with a higher weight.
+
+        Returns:
+            Completion | None: Completion, or None if the generation was cancelled.
+        """
+        user = update.effective_user.id
+        concurrency = self.settingsplug.configuration.concurrency
+        admin = user in concurrency.admins or update.effective_chat.id in concurrency.admins
+
+        if self.settingsplug.configuration.deadline.supersede:
+            for task in self.generations[user]:
+                task.cancel()
+
+        task = asyncio.ensure_future(self.gptplug.chat(
+            chat_id=update.effective_chat.id,
+            user=user,
+            weight=concurrency.admin_weight if admin else 1.0,
+            **kwargs
+        ))
+        self.generations[user].add(task)
+
+        try:
+            await asyncio.wait({task})
+
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        finally:
+            self.generations[user].discard(task)
+
+            if not self.generations[user]:
+                del self.generations[user]
+
+        return None if task.cancelled() else task.result()
+
+    async def _stream(self, update: Update, query: str) -> None:
+        """
+        Reply with a placeholder and progressively edit it as tokens arrive.
+
+        Edits are throttled to the configured interval, a longer one in group chats,
+        and pause for as long as Telegram asks when it rate limits them.
+        """
+        message = await update.message.reply_text(Formatters.chat_placeholder(), parse_mode='MarkdownV2')
+        streaming = self.settingsplug.configuration.streaming
+        group = update.effective_chat.type in (ChatType.GROUP, ChatType.SUPERGROUP)
+        interval = streaming.group_edit_interval if group else streaming.edit_interval
+        next_edit = 0.0
+
+        async def on_delta(text: str) -> None:
+            nonlocal next_edit
+
+            if time.monotonic() < next_edit:
+                return
+
+            next_edit = time.monotonic() + interval
+            delay = await self._edit(message, Formatters.chat_partial(text))
+            next_edit = max(next_edit, time.monotonic() + delay)
+
+        response = await self._generate(
+            update=update,
+            query=query,
+            settings=self.settingsplug.configuration,
+            prompt=self.promptplug.configuration,
+            on_delta=on_delta
+        )
+
+        await self._edit(
+            message,
+            Formatters.chat_reply(response) if response else Formatters.chat_stopped(),
+            final=True
+        )
+
     async def models(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         Handle the /models command for querying, listing, or updating model settings.
         """
         self._log(update=update, scope='Models')
 
-        attributes = ('model', 'temperature', 'frequency', 'presence', 'top')
+        attributes = ('model', 'temperature', 'frequency', 'presence', 'top', 'tokens', 'fallbacks', 'routing')
 
-        if len(context.args) == 1 and context.args[0] in ('get', 'list', 'default'):
+        if len(context.args) == 1 and context.args[0] in ('get', 'list', 'routing', 'probes', 'default'):
             match context.args[0]:
                 case 'get':
                     await update.message.reply_text(
@@ -73,8 +226,22 @@ class TelegramBot:
                         parse_mode='MarkdownV2'
                     )
                 case 'list':
+                    await self.gptplug.ready(self.settingsplug.configuration.catalog.wait)
+                    models = self.gptplug.models_list()
+
+                    # Render again only when the catalog actually changed
+                    if self.listing is None or self.listing[0] != self.gptplug.version:
+                        self.listing = (self.gptplug.version, Formatters.models_list(models))
+
+                    await update.message.reply_text(self.listing[1], parse_mode='MarkdownV2')
+                case 'routing':
+                    await update.message.reply_text(
+                        Formatters.models_routing(self.gptplug.routes(self.settingsplug.configuration)),
+                        parse_mode='MarkdownV2'
+                    )
+                case 'probes':
                     await update.message.reply_text(
-                        Formatters.models_list(self.gptplug.models_list()),
+                        Formatters.models_probes(self.gptplug.probes()),
                         parse_mode='MarkdownV2'
                     )
                 case 'default':
@@ -87,6 +254,10 @@ class TelegramBot:
             return
 
         elif len(context.args) == 3 and context.args[0] == 'set' and context.args[1] in attributes:
+            # Model names are validated against the catalog
+            if context.args[1] in ('model', 'fallbacks', 'routing'):
+                await self.gptplug.ready(self.settingsplug.configuration.catalog.wait)
+
             response = self.settingsplug.update(
                 **{context.args[1]: context.args[2],
                 'models': self.gptplug.models}
@@ -149,13 +320,69 @@ class TelegramBot:
             await update.message.reply_text(Formatters.chat_help(), parse_mode='MarkdownV2')
             return
 
-        response = self.gptplug.chat(
+        if self.settingsplug.configuration.stream:
+            await self._stream(update=update, query=query)
+            return
+
+        response = await self._generate(
+            update=update,
             query=query,
             settings=self.settingsplug.configuration,
             prompt=self.promptplug.configuration
         )
 
-        await update.message.reply_text(Formatters.chat_reply(response), parse_mode='MarkdownV2')
+        await update.message.reply_text(
+            Formatters.chat_reply(response) if response else Formatters.chat_stopped(),
+            parse_mode='MarkdownV2'
+        )
+
+    async def stop(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Handle the /stop command and cancel the user's in-flight generations.
+        """
+        self._log(update=update, scope='Stop')
+
+        tasks = self.generations.get(update.effective_user.id, set())
+
+        for task in tasks:
+            task.cancel()
+
+        await update.message.reply_text(Formatters.stop(len(tasks)), parse_mode='MarkdownV2')
+
+    async def similar(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Handle the /similar command enabling or disabling near-duplicate answers for the chat.
+        """
+        self._log(update=update, scope='Similar')
+
+        if len(context.args) == 1 and context.args[0] in ('get', 'on', 'off'):
+            chats = self.settingsplug.configuration.similar.chats
+            chat_id = update.effective_chat.id
+
+            match context.args[0]:
+                case 'on' if chat_id not in chats:
+                    chats.append(chat_id)
+                    self.settingsplug.save()
+                case 'off' if chat_id in chats:
+                    chats.remove(chat_id)
+                    self.settingsplug.save()
+
+            await update.message.reply_text(Formatters.similar_get(chat_id in chats), parse_mode='MarkdownV2')
+            return
+
+        await update.message.reply_text(Formatters.similar_help(), parse_mode='MarkdownV2')
+
+    async def metrics(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Handle the /metrics command and show the current metrics snapshot,
+        optionally only the series starting with a prefix, e.g. /metrics retry.
+        """
+        self._log(update=update, scope='Metrics')
+
+        prefix = context.args[0] if context.args else None
+
+        for message in Formatters.metrics(self.gptplug.metrics.snapshot(), prefix=prefix):
+            await update.message.reply_text(message, parse_mode='MarkdownV2')
 
     def run(self):
         """
@@ -0,0 +1,41 @@
+import re
+
+from telegram_gpt.structures import Triage, estimate_tokens
+
+
+CODE_PATTERN = re.compile(
+    r'```|`[^`\n]+`|#include\b|\bdef \w+\(|\bclass \w+[:(]|^\s*(from \w+ )?import \w+'
+    r'|\bfunction\s*\w*\(|\b(const|let|var) \w+ =|\bSELECT .+ FROM\b|[{};]\s*$|=>|==',
+    re.MULTILINE
+)
+
+
+def classify(query: str, policy: Triage) -> tuple[str, str]:
+    """
+    Decide whether a query is simple enough for the small model.
+
+    A query goes to the large model when it is long, spans many lines,
+    contains code or asks for reasoning through one of the configured keywords.
+
+    Args:
+        query (str): Raw user query.
+        policy (Triage): Thresholds.
+
+    Returns:
+        tuple[str, str]: ('small' or 'large', signal that decided it)
+    """
+    if estimate_tokens(query) > policy.max_tokens:
+        return 'large', 'length'
+
+    if query.count('\n') + 1 > policy.max_lines:
+        return 'large', 'lines'
+
+    if policy.code and CODE_PATTERN.search(query):
+        return 'large', 'code'
+
+    lowered = query.casefold()
+
+    if any(keyword.casefold() in lowered for keyword in policy.keywords):
+        return 'large', 'keyword'
+
+    return 'small', 'simple'
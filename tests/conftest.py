@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import json
+import logging
+
+from groq import AsyncGroq
+import httpx
+import pytest
+
+from telegram_gpt.logger import Logger
+from telegram_gpt.plugs import GPTPlug
+from telegram_gpt.structures import Prompt, Settings
+
+
+MODELS = [
+    {"id": "large", "active": True, "created": 1700000000, "owned_by": "Meta",
+     "context_window": 131072, "max_completion_tokens": 32768},
+    {"id": "small", "active": True, "created": 1700000000, "owned_by": "Meta",
+     "context_window": 8192, "max_completion_tokens": 8192},
+]
+
+
+class Upstream:
+    """
+    Fake Groq API served through httpx.MockTransport.
+
+    Completions answer with the model name after an optional delay, streamed as
+    server-sent events when requested. The models list carries etag when set
+    and answers 304 to a request revalidating it.
+    """
+
+    def __init__(self, delay: float = 0.0, reply: str = "hello there", etag: str | None = None):
+        self.delay = delay
+        self.reply = reply
+        self.etag = etag
+        self.models = MODELS
+        self.calls: list[dict] = []
+        self.listings: list[httpx.Request] = []
+
+    def usage(self, model: str) -> dict:
+        return {"prompt_tokens": 40, "completion_tokens": 3, "total_tokens": 43,
+                "completion_time": 0.01, "prompt_time": 0.001}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/models'):
+            self.listings.append(request)
+            headers = {"etag": self.etag} if self.etag else {}
+
+            if self.etag and request.headers.get('if-none-match') == self.etag:
+                return httpx.Response(304, headers=headers)
+
+            return httpx.Response(200, json={"object": "list", "data": self.models}, headers=headers)
+
+        body = json.loads(request.content)
+        self.calls.append(body)
+        await asyncio.sleep(self.delay)
+
+        model = body['model']
+        common = {"id": "chatcmpl-1", "created": 1700000000, "model": model}
+
+        if not body.get('stream'):
+            return httpx.Response(200, json={
+                **common,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": self.reply}}],
+                "usage": self.usage(model),
+            })
+
+        words = self.reply.split(' ')
+        chunks = [
+            {**common, "object": "chat.completion.chunk",
+             "choices": [{"index": 0, "delta": {"content": word if not index else ' ' + word}, "finish_reason": None}]}
+            for index, word in enumerate(words)
+        ]
+        chunks.append({**common, "object": "chat.completion.chunk",
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                       "x_groq": {"id": "req", "usage": self.usage(model)}})
+
+        stream = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, content=stream.encode(), headers={"content-type": "text/event-stream"})
+
+
+def mock(plug: GPTPlug, upstream: Upstream) -> GPTPlug:
+    """
+    Route every key of the plug through the fake upstream.
+    """
+    for credential in plug.keys.credentials:
+        credential.http = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        credential.client = AsyncGroq(api_key=credential.token, http_client=credential.http, max_retries=0)
+
+    return plug
+
+
+@pytest.fixture
+def settings() -> Settings:
+    settings = Settings(model='large')
+    settings.catalog.snapshot = None
+    return settings
+
+
+@pytest.fixture
+def gptplug(logger, settings):
+    """
+    Build a GPTPlug, optionally routed through a fake upstream, and close it on exit.
+
+    Usage: async with gptplug(Upstream()) as plug: ...
+    """
+    @contextlib.asynccontextmanager
+    async def build(upstream: Upstream | None = None, tokens: tuple[str, ...] = ('key-a',)):
+        plug = GPTPlug(logger=logger, tokens=list(tokens), settings=settings)
+
+        if upstream is not None:
+            mock(plug, upstream)
+
+        try:
+            yield plug
+        finally:
+            await plug.close()
+
+    return build
+
+
+@pytest.fixture
+def prompt() -> Prompt:
+    return Prompt(text="be brief")
+
+
+@pytest.fixture
+def logger() -> Logger:
+    return Logger(name='tests', level=logging.CRITICAL)
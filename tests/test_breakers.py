@@ -0,0 +1,77 @@
+import pytest
+
+from telegram_gpt import breakers
+from telegram_gpt.breakers import CircuitBreaker
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Breaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(breakers.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_breaker_trips_probes_and_recovers(logger, clock):
+    breaker = CircuitBreaker(logger=logger, metrics=Metrics(), policy=Breaker(failures=3, cooldown=30.0, probes=1))
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(failed=True)
+
+    assert breaker.state == 'closed'
+    breaker.record(failed=True)
+    assert breaker.state == 'open'
+
+    # Calls fail fast until the cooldown is over
+    assert not breaker.available() and not breaker.allow()
+    clock[0] += 30
+
+    # A single probe is admitted, a failing one reopens the circuit
+    assert breaker.available() and breaker.allow()
+    assert breaker.state == 'half-open' and not breaker.allow()
+    breaker.record(failed=True)
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(failed=False)
+    assert breaker.state == 'closed' and breaker.consecutive == 0 and not breaker.outcomes
+
+
+def test_breaker_trips_on_error_rate(logger, clock):
+    breaker = CircuitBreaker(logger=logger, metrics=Metrics(),
+                             policy=Breaker(failures=100, error_rate=0.5, min_requests=4, window=60.0))
+
+    for failed in (False, True, False):
+        breaker.record(failed=failed)
+
+    assert breaker.state == 'closed'
+    breaker.record(failed=True)
+    assert breaker.state == 'open'
+
+
+def test_breaker_forgets_outcomes_outside_the_window(logger, clock):
+    breaker = CircuitBreaker(logger=logger, metrics=Metrics(),
+                             policy=Breaker(failures=100, error_rate=0.5, min_requests=4, window=60.0))
+
+    for failed in (True, True, True):
+        breaker.record(failed=failed)
+
+    clock[0] += 61
+
+    for failed in (False, False, False, True):
+        breaker.record(failed=failed)
+
+    assert breaker.state == 'closed'
+
+
+def test_released_probe_frees_its_slot(logger, clock):
+    breaker = CircuitBreaker(logger=logger, metrics=Metrics(), policy=Breaker(failures=1, cooldown=30.0, probes=1))
+    breaker.record(failed=True)
+    clock[0] += 30
+
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
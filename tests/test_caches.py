@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from telegram_gpt.caches import SimilarityCache, SingleFlight
+
+
+def test_slow_listener_does_not_stall_the_shared_call(logger):
+    received = []
+
+    async def slow(text: str) -> None:
+        await asyncio.sleep(0.2)
+        received.append(text)
+
+    async def call(on_delta):
+        started = time.monotonic()
+
+        for text in ("a", "ab", "abc", "abcd"):
+            await on_delta(text)
+
+        return time.monotonic() - started
+
+    async def run():
+        return await SingleFlight(logger=logger).do("key", call, on_delta=slow)
+
+    elapsed, shared = asyncio.run(run())
+
+    assert elapsed < 0.05
+    assert not shared
+    assert received[-1] == "abcd" and len(received) < 4
+
+
+def test_failing_listener_is_logged(logger, monkeypatch):
+    logged = []
+    monkeypatch.setattr(logger, 'debug', lambda **kwargs: logged.append(kwargs))
+
+    async def broken(text: str) -> None:
+        raise RuntimeError("message deleted")
+
+    async def call(on_delta):
+        await on_delta("a")
+        return "a"
+
+    async def run():
+        return await SingleFlight(logger=logger).do("key", call, on_delta=broken)
+
+    assert asyncio.run(run()) == ("a", False)
+    assert "message deleted" in logged[0]['message']
+
+
+def test_similar_queries_match_only_with_equal_numbers():
+    cache = SimilarityCache(threshold=0.9, max_entries=10, ttl=60)
+    cache.put("ctx", "who won the 2022 world cup", "Argentina")
+
+    assert cache.get("ctx", "Who won the 2022 World Cup?")[0] == "Argentina"
+    assert cache.get("ctx", "who won the 2018 world cup") is None
+    assert cache.get("other", "who won the 2022 world cup") is None
@@ -0,0 +1,86 @@
+import asyncio
+
+from conftest import MODELS, Upstream
+
+
+def test_refresh_revalidates_with_etag(gptplug):
+    upstream = Upstream(etag='"v1"')
+
+    async def run():
+        async with gptplug(upstream) as plug:
+            assert await plug.refresh() and await plug.refresh()
+            return plug
+
+    plug = asyncio.run(run())
+
+    assert 'if-none-match' not in upstream.listings[0].headers
+    assert upstream.listings[1].headers['if-none-match'] == '"v1"'
+    assert plug.version == 1 and plug.models.ids() == ['large', 'small']
+    assert plug.metrics.counters['catalog_refreshes_total{outcome=fetched}'] == 1
+    assert plug.metrics.counters['catalog_refreshes_total{outcome=not_modified}'] == 1
+
+
+def test_refresh_skips_unchanged_payload(gptplug):
+    upstream = Upstream()
+
+    async def run():
+        async with gptplug(upstream) as plug:
+            await plug.refresh()
+            catalog = plug.models
+
+            await plug.refresh()
+            assert plug.models is catalog and plug.version == 1
+
+            upstream.models = MODELS[:1]
+            await plug.refresh()
+            return plug
+
+    plug = asyncio.run(run())
+
+    assert plug.version == 2 and plug.models.ids() == ['large']
+    assert plug.metrics.counters['catalog_refreshes_total{outcome=unchanged}'] == 1
+    assert plug.metrics.counters['catalog_refreshes_total{outcome=fetched}'] == 2
+
+
+def test_snapshot_round_trip(gptplug, settings, tmp_path):
+    settings.catalog.snapshot = str(tmp_path / "catalog.json")
+    upstream = Upstream(etag='"v1"')
+
+    async def run():
+        async with gptplug(upstream) as plug:
+            await plug.refresh()
+
+        async with gptplug(upstream) as plug:
+            assert plug.restore()
+            restored = plug.models.ids(), plug.validators, plug.age()
+
+            # The restored validators make the first refresh conditional
+            assert await plug.refresh()
+            return plug, restored
+
+    plug, (ids, validators, age) = asyncio.run(run())
+
+    assert ids == ['large', 'small'] and plug.models.context_window('small') == 8192
+    assert validators == {'If-None-Match': '"v1"'} and age < 5
+    assert upstream.listings[-1].headers['if-none-match'] == '"v1"'
+    assert plug.metrics.counters['catalog_refreshes_total{outcome=not_modified}'] == 1
+
+
+def test_corrupt_snapshot_is_ignored(gptplug, settings, tmp_path, logger, monkeypatch):
+    path = tmp_path / "catalog.json"
+    settings.catalog.snapshot = str(path)
+    warnings = []
+    monkeypatch.setattr(logger, 'warning', lambda **kwargs: warnings.append(kwargs))
+
+    async def run():
+        async with gptplug() as plug:
+            for content in ('{"models": [', '{"fetched": 0}', '{"fetched": 0, "models": [{"name": "x"}]}'):
+                path.write_text(content)
+                assert not plug.restore()
+
+            return plug
+
+    plug = asyncio.run(run())
+
+    assert len(plug.models) == 0 and plug.fetched is None and plug.version == 0
+    assert len(warnings) == 3 and all("unreadable catalog snapshot" in warning['message'] for warning in warnings)
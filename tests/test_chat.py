@@ -0,0 +1,85 @@
+import asyncio
+
+from telegram_gpt.plugs import GPTPlug, Prefetched
+
+from conftest import Upstream
+
+
+def test_chat_completes(gptplug, settings, prompt):
+    async def run():
+        async with gptplug(Upstream()) as plug:
+            return await plug.chat(query="hi", settings=settings, prompt=prompt)
+
+    completion = asyncio.run(run())
+
+    assert completion.success
+    assert completion.text == "hello there"
+    assert completion.model == 'large'
+    assert not completion.fallback
+
+
+def test_chat_streams(gptplug, settings, prompt):
+    deltas = []
+
+    async def on_delta(text: str) -> None:
+        deltas.append(text)
+
+    async def run():
+        async with gptplug(Upstream()) as plug:
+            return await plug.chat(query="hi", settings=settings, prompt=prompt, on_delta=on_delta)
+
+    completion = asyncio.run(run())
+
+    assert completion.success
+    assert completion.text == "hello there"
+    assert deltas[-1] == "hello there"
+
+
+class Slow(Upstream):
+    """
+    Upstream answering the 'large' model slowly.
+    """
+
+    async def __call__(self, request):
+        if b'"large"' in request.content:
+            await asyncio.sleep(0.5)
+
+        return await super().__call__(request)
+
+
+def test_chat_credits_hedge_winner(gptplug, settings, prompt):
+    settings.hedge.enabled = True
+    settings.hedge.min_samples = 1
+    settings.hedge.max_rate = 1.0
+    settings.hedge.model = 'small'
+
+    async def run():
+        async with gptplug(Slow()) as plug:
+            plug.hedger.record('large', 0.01)
+            return await plug.chat(query="hi", settings=settings, prompt=prompt)
+
+    completion = asyncio.run(run())
+
+    assert completion.success
+    assert completion.model == 'small'
+    assert completion.fallback
+
+
+def test_discarded_hedge_loser_closes_its_stream():
+    class Stream:
+        closed = False
+
+        async def close(self):
+            self.closed = True
+
+    stream = Stream()
+
+    async def run():
+        loser = asyncio.get_running_loop().create_future()
+        loser.set_result(Prefetched(first={"chunk": 0}, stream=stream))
+        GPTPlug._discard(loser)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert stream.closed
@@ -0,0 +1,12 @@
+import asyncio
+
+
+def test_key_labels_do_not_leak_tokens(gptplug):
+    async def run():
+        async with gptplug(tokens=('gsk_secret1234', 'gsk_secret5678')) as plug:
+            return plug
+
+    plug = asyncio.run(run())
+
+    assert [credential.label for credential in plug.keys.credentials] == ['0', '1']
+    assert not any('1234' in name or '5678' in name for name in plug.metrics.snapshot())
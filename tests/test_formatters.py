@@ -0,0 +1,20 @@
+from telegram_gpt.constants import MESSAGE_LIMIT
+from telegram_gpt.formatters import Formatters
+
+
+def test_metrics_fit_telegram_messages():
+    snapshot = {f"retry_attempts_total{{model=\"model-{index}\",key=\"{index}\"}}": index for index in range(500)}
+    snapshot['hedges_total'] = 1
+
+    messages = Formatters.metrics(snapshot)
+
+    assert len(messages) > 1
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert sum(message.count("\n") + 1 for message in messages) - 2 == len(snapshot)
+
+
+def test_metrics_filter_by_prefix():
+    messages = Formatters.metrics({'retry_attempts_total': 3, 'hedges_total': 1}, prefix='retry')
+
+    assert len(messages) == 1
+    assert 'retry' in messages[0] and 'hedges' not in messages[0]
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from telegram_gpt.limiters import Bulkhead, Overloaded
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.structures import Concurrency
+
+
+async def hold(bulkhead: Bulkhead, user, released: asyncio.Event, served: list | None = None,
+               weight: float = 1.0) -> None:
+    """
+    Occupy a slot until released.
+    """
+    async with bulkhead.slot(user=user, weight=weight):
+        if served is not None:
+            served.append(user)
+
+        await released.wait()
+
+
+async def queue(bulkhead: Bulkhead, *users, released: asyncio.Event | None = None,
+                served: list | None = None, weight: float = 1.0) -> list[asyncio.Task]:
+    """
+    Queue one request per user, in order, while the slot is taken.
+    """
+    tasks = []
+
+    for user in users:
+        tasks.append(asyncio.ensure_future(hold(bulkhead, user, released or asyncio.Event(), served, weight)))
+        await asyncio.sleep(0)
+
+    return tasks
+
+
+@pytest.mark.parametrize('policy, users, reason', [
+    (Concurrency(limit=1, queue=2, per_user=5), ('a', 'b'), 'queue_full'),
+    (Concurrency(limit=1, queue=10, per_user=1), ('c',), 'user_queue_full'),
+])
+def test_bulkhead_sheds_when_the_queue_is_full(logger, policy, users, reason):
+    metrics = Metrics()
+    bulkhead = Bulkhead(logger=logger, metrics=metrics, policy=policy)
+
+    async def run():
+        released = asyncio.Event()
+        holder = asyncio.ensure_future(hold(bulkhead, 'holder', released))
+        await asyncio.sleep(0)
+        waiting = await queue(bulkhead, *users)
+
+        with pytest.raises(Overloaded) as shed:
+            async with bulkhead.slot(user='c'):
+                pass
+
+        for task in [holder, *waiting]:
+            task.cancel()
+
+        await asyncio.gather(holder, *waiting, return_exceptions=True)
+        return shed.value
+
+    assert asyncio.run(run()).reason == reason
+    assert metrics.counters[f'concurrency_shed_total{{reason={reason}}}'] == 1
+    assert bulkhead.active == 0 and bulkhead.depth == 0
+
+
+def test_bulkhead_sheds_after_max_wait(logger):
+    bulkhead = Bulkhead(logger=logger, metrics=Metrics(), policy=Concurrency(limit=1, max_wait=0.05))
+
+    async def run():
+        released = asyncio.Event()
+        holder = asyncio.ensure_future(hold(bulkhead, 'holder', released))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as shed:
+            async with bulkhead.slot(user='late'):
+                pass
+
+        assert bulkhead.depth == 0 and not bulkhead.queued
+
+        released.set()
+        await holder
+        return shed.value
+
+    assert asyncio.run(run()).reason == 'wait'
+    assert bulkhead.active == 0
+
+
+def served_order(bulkhead: Bulkhead, *batches: tuple[tuple[str, ...], float]) -> list[str]:
+    """
+    Queue batches of (users, weight) behind a taken slot, then release it and record the serving order.
+    """
+    served = []
+
+    async def run():
+        released, done = asyncio.Event(), asyncio.Event()
+        done.set()
+
+        holder = asyncio.ensure_future(hold(bulkhead, 'holder', released))
+        await asyncio.sleep(0)
+
+        waiting = []
+
+        for users, weight in batches:
+            waiting += await queue(bulkhead, *users, released=done, served=served, weight=weight)
+
+        released.set()
+        await asyncio.gather(holder, *waiting)
+
+    asyncio.run(run())
+    return served
+
+
+def test_bulkhead_serves_users_fairly(logger):
+    bulkhead = Bulkhead(logger=logger, metrics=Metrics(), policy=Concurrency(limit=1, queue=20, per_user=5))
+
+    # A user flooding the queue first only delays their own later requests
+    served = served_order(bulkhead, (('flood', 'flood', 'flood'), 1.0), (('polite',), 1.0))
+
+    assert served == ['flood', 'polite', 'flood', 'flood']
+    assert bulkhead.active == 0 and not bulkhead.finish
+
+
+def test_bulkhead_serves_heavier_users_more_often(logger):
+    bulkhead = Bulkhead(logger=logger, metrics=Metrics(), policy=Concurrency(limit=1, queue=20, per_user=5))
+
+    served = served_order(bulkhead, (('user',) * 3, 1.0), (('admin',) * 3, 4.0))
+
+    assert served == ['admin', 'admin', 'admin', 'user', 'user', 'user']
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from conftest import Upstream
+
+
+DELAY = 0.2
+
+
+def wall_time(gptplug, settings, prompt, chats: int) -> float:
+    """
+    Run chats concurrent, distinct completions against an upstream answering after DELAY seconds.
+    """
+    async def run():
+        async with gptplug(Upstream(delay=DELAY)) as plug:
+            started = time.monotonic()
+            completions = await asyncio.gather(*(
+                plug.chat(query=f"question {index}", settings=settings, prompt=prompt)
+                for index in range(chats)
+            ))
+
+            assert all(completion.success for completion in completions)
+            return time.monotonic() - started
+
+    return asyncio.run(run())
+
+
+def test_throughput_scales_with_concurrent_chats(gptplug, settings, prompt):
+    settings.concurrency.limit = 100
+    settings.concurrency.queue = 100
+
+    timings = {chats: wall_time(gptplug, settings, prompt, chats) for chats in (1, 10, 50)}
+
+    # Sequential handling would take chats * DELAY, concurrent handling stays close to a single chat
+    assert timings[50] < timings[1] + DELAY
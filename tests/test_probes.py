@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from telegram_gpt.plugs import GPTPlug
+
+from conftest import Upstream
+
+
+def test_probe_records_latency_and_billed_tokens(gptplug):
+    async def run():
+        async with gptplug(Upstream()) as plug:
+            await plug.prober.probe('small')
+            return plug
+
+    plug = asyncio.run(run())
+    [row] = plug.probes()
+
+    assert row.model == 'small' and row.error_rate == 0.0 and row.ttft is not None
+    assert [tokens for _, tokens in plug.prober.spent] == [43]
+    assert 'small' in plug.router.ttft
+
+
+def test_probe_budget_reserves_template_overhead(logger, settings):
+    settings.probe.budget = 100
+    plug = GPTPlug(logger=logger, tokens=['key-a'], settings=settings)
+
+    assert plug.prober.cost > 60
+    assert plug.prober.affordable()
+
+    plug.prober.spent.append([time.monotonic(), plug.prober.cost])
+    assert not plug.prober.affordable()
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+from telegram_gpt import retries
+from telegram_gpt.metrics import Metrics
+from telegram_gpt.retries import Retrier, RetryBudget, parse_duration
+from telegram_gpt.structures import Retry
+
+
+def failure(status: int, **headers) -> httpx.HTTPStatusError:
+    request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"status {status}", request=request, response=response)
+
+
+def test_budget_caps_retries_to_a_share_of_calls(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retries.time, 'monotonic', lambda: now[0])
+    budget = RetryBudget(ratio=0.5, minimum=1, window=10)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.record()
+    budget.record()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    # Retries and calls leave the window together
+    now[0] += 11
+    assert budget.withdraw()
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('7', 7.0), ('2m59.5s', 179.5), ('120ms', 0.12), ('soon', None), (None, None)
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_delay_honours_retry_after(logger):
+    retrier = Retrier(logger=logger, metrics=Metrics(), policy=Retry(base_delay=0.5))
+
+    for _ in range(20):
+        assert 7.0 <= retrier.delay(1, failure(503, **{'retry-after': '7'})) <= 7.5
+        assert 3.0 <= retrier.delay(1, failure(429, **{'x-ratelimit-reset-tokens': '3s'})) <= 3.5
+
+
+def test_delay_backs_off_exponentially_with_a_cap(logger):
+    retrier = Retrier(logger=logger, metrics=Metrics(), policy=Retry(base_delay=0.5, max_delay=1.5))
+
+    for _ in range(20):
+        assert 0.0 <= retrier.delay(1, failure(503)) <= 0.5
+        assert 0.0 <= retrier.delay(2, failure(503)) <= 1.0
+        assert 0.0 <= retrier.delay(5, failure(503)) <= 1.5
+
+
+def test_run_retries_retryable_failures(logger):
+    metrics = Metrics()
+    retrier = Retrier(logger=logger, metrics=metrics, policy=Retry(attempts=3, base_delay=0.0))
+    outcomes = [failure(503), failure(429), "done"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        return outcome
+
+    assert asyncio.run(retrier.run(call, scope='Test')) == "done"
+    assert metrics.counters['retries_total{scope=Test,status=503}'] == 1
+
+
+def test_run_does_not_retry_client_errors(logger):
+    retrier = Retrier(logger=logger, metrics=Metrics(), policy=Retry(attempts=3))
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise failure(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(retrier.run(call, scope='Test'))
+
+    assert len(calls) == 1
+
+
+def test_run_gives_up_when_retry_after_exceeds_max_delay(logger):
+    metrics = Metrics()
+    retrier = Retrier(logger=logger, metrics=metrics, policy=Retry(attempts=3, max_delay=20.0))
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise failure(429, **{'retry-after': '60'})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(retrier.run(call, scope='Test'))
+
+    assert len(calls) == 1
+    assert metrics.counters['retry_give_ups_total{reason=delay,scope=Test}'] == 1
+
+
+def test_run_gives_up_once_the_budget_is_spent(logger):
+    metrics = Metrics()
+    policy = Retry(attempts=5, base_delay=0.0, budget_minimum=1, budget_ratio=0.0)
+    retrier = Retrier(logger=logger, metrics=metrics, policy=policy)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise failure(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(retrier.run(call, scope='Test'))
+
+    assert len(calls) == 2
+    assert metrics.counters['retry_give_ups_total{reason=budget,scope=Test}'] == 1
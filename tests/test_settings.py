@@ -0,0 +1,81 @@
+import asyncio
+
+from telegram_gpt.constants import DEFAULT_MODEL
+from telegram_gpt.plugs import GPTPlug, PromptPlug, SettingsPlug
+
+from conftest import Upstream, mock
+
+
+def test_preset_resets_sampling_only(logger, tmp_path):
+    path = str(tmp_path / "settings.yaml")
+    plug = SettingsPlug(logger=logger, filepath=path).load(path)
+    settings = plug.configuration
+    settings.catalog.snapshot = None
+
+    gpt = GPTPlug(logger=logger, tokens=['key-a'], settings=settings)
+
+    settings.model = 'small'
+    settings.temperature = 0.2
+    settings.concurrency.admins = [42]
+    settings.similar.chats = [7]
+    settings.retry.attempts = 5
+
+    plug.preset()
+
+    assert plug.configuration is settings
+    assert (settings.model, settings.temperature) == (DEFAULT_MODEL, 1.0)
+    assert settings.concurrency.admins == [42] and settings.similar.chats == [7]
+    assert gpt.retrier.policy is settings.retry and gpt.retrier.policy.attempts == 5
+    assert gpt.bulkhead.policy is settings.concurrency
+
+    reloaded = SettingsPlug(logger=logger, filepath=path).load(path).configuration
+    assert reloaded.concurrency.admins == [42] and reloaded.model == DEFAULT_MODEL
+
+
+def test_streaming_intervals_load_from_yaml(logger, tmp_path):
+    path = tmp_path / "settings.yaml"
+    path.write_text("model: large\nstreaming:\n  edit_interval: 2.0\n")
+
+    settings = SettingsPlug(logger=logger, filepath=str(path)).load().configuration
+
+    assert settings.streaming.edit_interval == 2.0
+    assert settings.streaming.group_edit_interval == 3.0
+
+
+def test_configuration_changes_invalidate_cached_completions(logger, tmp_path):
+    settings_path, prompt_path = tmp_path / "settings.yaml", tmp_path / "prompt.txt"
+    settings_path.write_text("model: large\ntemperature: 0.0\ncatalog:\n  snapshot: null\n")
+    prompt_path.write_text("be brief")
+
+    settingsplug = SettingsPlug(logger=logger, filepath=str(settings_path)).load()
+    promptplug = PromptPlug(logger=logger, filepath=str(prompt_path)).load()
+    upstream = Upstream()
+
+    async def run():
+        plug = mock(GPTPlug(logger=logger, tokens=['key-a'], settings=settingsplug.configuration), upstream)
+        settingsplug.subscribe(plug.invalidate)
+        promptplug.subscribe(plug.invalidate)
+
+        async def ask():
+            await plug.chat(query="hi", settings=settingsplug.configuration, prompt=promptplug.configuration)
+            return len(plug.cache)
+
+        try:
+            assert await ask() == 1 and await ask() == 1
+            assert len(upstream.calls) == 1
+
+            # Setting a value it already has changes nothing
+            settingsplug.update(temperature='0')
+            assert len(plug.cache) == 1
+
+            settingsplug.update(presence='0.5')
+            assert len(plug.cache) == 0
+
+            assert await ask() == 1
+            promptplug.update(prompt="be verbose")
+            assert len(plug.cache) == 0
+
+        finally:
+            await plug.close()
+
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+from telegram_gpt.structures import Model, ModelCatalog
+
+
+CATALOG = ModelCatalog([
+    Model(model='llama-8b', owned_by='Meta', context_window=8192),
+    Model(model='llama-70b', owned_by='Meta', context_window=131072),
+    Model(model='gemma-9b', owned_by='Google', context_window=8000),
+    Model(model='whisper', owned_by='OpenAI'),
+])
+
+
+def test_catalog_lookups():
+    assert 'llama-70b' in CATALOG and 'gpt-4' not in CATALOG
+    assert CATALOG.ids() == ['llama-8b', 'llama-70b', 'gemma-9b', 'whisper']
+    assert CATALOG.context_window('llama-70b') == 131072
+    assert CATALOG.context_window('whisper') is None
+
+
+def test_catalog_owned_by():
+    assert [model.model for model in CATALOG.owned_by('Meta')] == ['llama-8b', 'llama-70b']
+    assert CATALOG.owned_by('Mistral') == []
+
+
+def test_catalog_fitting():
+    assert ModelCatalog.bucket(8000) == ModelCatalog.bucket(8192) == 8192
+
+    # 8100 shares the 8192 bucket with both 8k models, only one of them holds it
+    assert {model.model for model in CATALOG.fitting(8100)} == {'llama-8b', 'llama-70b'}
+    assert {model.model for model in CATALOG.fitting(100)} == {'llama-8b', 'llama-70b', 'gemma-9b'}
+    assert CATALOG.fitting(200000) == []